@@ -38,6 +38,9 @@ class Settings(BaseSettings):
     max_resolution: tuple = (3840, 2160)  # 4K max
     enable_gpu: bool = Field(True, env="GPL_USE_GPU")
     enable_neural_engine: bool = Field(True, env="GPL_USE_NEURAL")
+    # Reuse the tone map on alternate frames above this motion level. Motion
+    # tops out at 1.0, so the default leaves it off
+    motion_skip_threshold: float = Field(1.0, env="GPL_MOTION_SKIP")
     
     # HDR Parameters
     hdr_base_algorithm: str = Field("advanced_clahe", env="GPL_HDR_ALGO")
@@ -0,0 +1,70 @@
+"""
+GPL Frame Statistics
+Single-pass brightness/saturation/percentile kernel for video analysis
+"""
+
+import numpy as np
+
+from core.utils.jit import njit, prange
+
+# Rows per parallel work item
+_BLOCK_ROWS = 64
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def frame_stats(bgr: np.ndarray):
+    """
+    Compute per-frame analysis statistics in one pass over a BGR frame
+    
+    Matches OpenCV's 8-bit conventions to within a level: brightness is
+    BGR2GRAY (Rec.601) luma, S is HSV saturation, and the percentiles come
+    from a 256-bin histogram of the same luma.
+    
+    Args:
+        bgr: Input frame (BGR, uint8)
+    
+    Returns:
+        Tuple of (mean luma, mean S, 95th percentile luma, 5th percentile luma)
+    """
+    rows, cols = bgr.shape[0], bgr.shape[1]
+    blocks = (rows + _BLOCK_ROWS - 1) // _BLOCK_ROWS
+    
+    # Per-block partial results, so parallel blocks never write the same slot
+    y_sums = np.zeros(blocks)
+    s_sums = np.zeros(blocks)
+    block_hists = np.zeros((blocks, 256), dtype=np.int64)
+    
+    for block in prange(blocks):
+        # Block-local sums and histogram stay in cache for the whole band
+        y_sum = 0.0
+        s_sum = 0.0
+        band_hist = np.zeros(256, dtype=np.int64)
+        
+        for y in range(block * _BLOCK_ROWS, min((block + 1) * _BLOCK_ROWS, rows)):
+            for x in range(cols):
+                b = bgr[y, x, 0]
+                g = bgr[y, x, 1]
+                r = bgr[y, x, 2]
+                
+                # Luma, for brightness and the histogram
+                luma = 0.114 * b + 0.587 * g + 0.299 * r
+                y_sum += luma
+                band_hist[min(int(luma + 0.5), 255)] += 1
+                
+                # HSV saturation
+                hi = max(b, g, r)
+                lo = min(b, g, r)
+                if hi > 0:
+                    s_sum += (hi - lo) * 255.0 / hi
+        
+        y_sums[block] = y_sum
+        s_sums[block] = s_sum
+        block_hists[block] = band_hist
+    
+    pixels = rows * cols
+    hist = block_hists.sum(axis=0)
+    cdf = np.cumsum(hist)
+    lo5 = np.searchsorted(cdf, 0.05 * pixels)
+    hi95 = np.searchsorted(cdf, 0.95 * pixels)
+    
+    return y_sums.sum() / pixels, s_sums.sum() / pixels, float(hi95), float(lo5)
@@ -0,0 +1,36 @@
+"""
+GPL Highlight/Shadow Adjustment
+Fused single-pass luminance-masked gain kernel
+"""
+
+import numpy as np
+
+from core.utils.jit import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def adjust_highlights_shadows(img: np.ndarray, highlights: float, shadows: float, out: np.ndarray):
+    """
+    Scale each BGR pixel by its highlight/shadow mask in one pass
+    
+    Args:
+        img: Input frame (BGR, uint8)
+        highlights: Gain applied to pixels above mid luminance
+        shadows: Gain applied to pixels below mid luminance
+        out: Output frame, same shape and dtype as img
+    """
+    rows, cols = img.shape[0], img.shape[1]
+    for y in prange(rows):
+        for x in range(cols):
+            b = img[y, x, 0] / 255.0
+            g = img[y, x, 1] / 255.0
+            r = img[y, x, 2] / 255.0
+            lum = 0.114 * b + 0.587 * g + 0.299 * r
+            
+            highlight_mask = min(max((lum - 0.5) * 2.0, 0.0), 1.0)
+            shadow_mask = min(max((0.5 - lum) * 2.0, 0.0), 1.0)
+            factor = (1.0 + highlights * highlight_mask) * (1.0 + shadows * shadow_mask) * 255.0
+            
+            out[y, x, 0] = min(max(b * factor, 0.0), 255.0)
+            out[y, x, 1] = min(max(g * factor, 0.0), 255.0)
+            out[y, x, 2] = min(max(r * factor, 0.0), 255.0)
@@ -6,16 +6,79 @@ Optimized for Apple M4 Pro with Metal acceleration
 
 import cv2
 import numpy as np
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, Callable
 from dataclasses import dataclass
 import time
-from scipy.interpolate import interp1d
 
-from config.settings import settings, HDR_PRESETS, TELEMETRY_HDR_MAPPINGS
+from config.settings import settings, ProcessingMode, HDR_PRESETS, TELEMETRY_HDR_MAPPINGS
 from telemetry.base import TelemetryFrame, TelemetryType
+from core.algorithms.highlights_shadows import adjust_highlights_shadows
+from core.utils.jit import NUMBA_AVAILABLE
 
 
-@dataclass
+class _TelemetryLUT:
+    """Dense lookup table over a telemetry axis, sampled at a fixed resolution"""
+    
+    def __init__(self, points: Dict[float, float], resolution: float = 1.0, nearest: bool = False):
+        keys = sorted(points)
+        values = np.array([points[k] for k in keys], dtype=np.float64)
+        count = int(round((keys[-1] - keys[0]) / resolution)) + 1
+        samples = keys[0] + np.arange(count) * resolution
+        
+        if nearest:
+            # Closest control point, ties resolved towards the lower one
+            closest = np.abs(samples[:, np.newaxis] - np.array(keys)[np.newaxis, :]).argmin(axis=1)
+            self.table = values[closest]
+        else:
+            # Piecewise linear, clamped to the end points
+            self.table = np.interp(samples, keys, values)
+        
+        self.origin = keys[0]
+        self.resolution = resolution
+        self._last = count - 1
+    
+    def __getitem__(self, value: float) -> float:
+        idx = int(round((value - self.origin) / self.resolution))
+        return float(self.table[min(max(idx, 0), self._last)])
+
+
+def _telemetry_lut(mapping: str, field: str, **kwargs) -> _TelemetryLUT:
+    """Build a dense LUT for one field of a TELEMETRY_HDR_MAPPINGS table"""
+    table = TELEMETRY_HDR_MAPPINGS[mapping]
+    return _TelemetryLUT({k: v[field] for k, v in table.items()}, **kwargs)
+
+
+# Parameters within this of their pass-through value skip their stage
+_EPS = 1e-3
+
+# Telemetry -> parameter tables, built once at import
+# (1 lux, 1 K and 1% motion steps)
+_LUX_EXPOSURE_LUT = _telemetry_lut("ambient_light", "exposure")
+_LUX_CONTRAST_LUT = _telemetry_lut("ambient_light", "contrast")
+_KELVIN_R_GAIN_LUT = _telemetry_lut("color_temperature", "r_gain")
+_KELVIN_B_GAIN_LUT = _telemetry_lut("color_temperature", "b_gain")
+_MOTION_SHARPENING_LUT = _telemetry_lut("motion_level", "sharpening", resolution=0.01, nearest=True)
+
+
+@dataclass(frozen=True, slots=True)
+class HDRPreset:
+    """Static HDR preset, resolved once from HDR_PRESETS"""
+    clahe_clip: float
+    clahe_grid: Tuple[int, int]
+    saturation_boost: float
+    sharpening: float
+    tone_curve: str
+    denoise: bool = False
+    denoise_strength: int = 0
+    detail_enhancement: bool = False
+
+
+PRESETS: Dict[str, HDRPreset] = {
+    name: HDRPreset(**values) for name, values in HDR_PRESETS.items()
+}
+
+
+@dataclass(slots=True)
 class HDRParameters:
     """Dynamic HDR processing parameters"""
     exposure: float = 1.0
@@ -32,58 +95,31 @@ class HDRParameters:
     
     def interpolate_from_telemetry(self, telemetry: Dict[TelemetryType, Any]):
         """Update parameters based on telemetry data"""
+        self.interpolate_from_readings(
+            telemetry.get(TelemetryType.AMBIENT_LIGHT),
+            telemetry.get(TelemetryType.COLOR_TEMPERATURE),
+            telemetry.get(TelemetryType.MOTION)
+        )
+    
+    def interpolate_from_readings(self,
+                                  lux: Optional[float] = None,
+                                  kelvin: Optional[float] = None,
+                                  motion: Optional[float] = None):
+        """Update parameters from raw readings; None leaves the related parameters alone"""
         # Ambient light adjustments
-        if TelemetryType.AMBIENT_LIGHT in telemetry:
-            lux = telemetry[TelemetryType.AMBIENT_LIGHT]
-            mapping = TELEMETRY_HDR_MAPPINGS["ambient_light"]
-            
-            # Interpolate between defined points
-            lux_points = sorted(mapping.keys())
-            if lux <= lux_points[0]:
-                params = mapping[lux_points[0]]
-            elif lux >= lux_points[-1]:
-                params = mapping[lux_points[-1]]
-            else:
-                # Linear interpolation
-                for i in range(len(lux_points) - 1):
-                    if lux_points[i] <= lux <= lux_points[i + 1]:
-                        t = (lux - lux_points[i]) / (lux_points[i + 1] - lux_points[i])
-                        p1, p2 = mapping[lux_points[i]], mapping[lux_points[i + 1]]
-                        self.exposure = p1["exposure"] * (1 - t) + p2["exposure"] * t
-                        self.contrast = p1["contrast"] * (1 - t) + p2["contrast"] * t
-                        break
-        
-        # Motion adjustments
-        if TelemetryType.MOTION in telemetry:
-            motion = telemetry[TelemetryType.MOTION]
-            motion_map = TELEMETRY_HDR_MAPPINGS["motion_level"]
-            
-            # Find closest motion level
-            levels = sorted(motion_map.keys())
-            closest = min(levels, key=lambda x: abs(x - motion))
-            self.sharpening = motion_map[closest]["sharpening"]
+        if lux is not None:
+            self.exposure = _LUX_EXPOSURE_LUT[lux]
+            self.contrast = _LUX_CONTRAST_LUT[lux]
+        
+        # Motion adjustments (closest defined motion level)
+        if motion is not None:
+            self.sharpening = _MOTION_SHARPENING_LUT[motion]
         
         # Color temperature adjustments
-        if TelemetryType.COLOR_TEMPERATURE in telemetry:
-            kelvin = telemetry[TelemetryType.COLOR_TEMPERATURE]
-            temp_map = TELEMETRY_HDR_MAPPINGS["color_temperature"]
-            
-            # Interpolate white balance
-            temps = sorted(temp_map.keys())
-            if kelvin <= temps[0]:
-                wb = temp_map[temps[0]]
-            elif kelvin >= temps[-1]:
-                wb = temp_map[temps[-1]]
-            else:
-                # Interpolate
-                for i in range(len(temps) - 1):
-                    if temps[i] <= kelvin <= temps[i + 1]:
-                        t = (kelvin - temps[i]) / (temps[i + 1] - temps[i])
-                        w1, w2 = temp_map[temps[i]], temp_map[temps[i + 1]]
-                        r = w1["r_gain"] * (1 - t) + w2["r_gain"] * t
-                        b = w1["b_gain"] * (1 - t) + w2["b_gain"] * t
-                        self.white_balance = (r, 1.0, b)
-                        break
+        if kelvin is not None:
+            self.white_balance = (
+                _KELVIN_R_GAIN_LUT[kelvin], 1.0, _KELVIN_B_GAIN_LUT[kelvin]
+            )
 
 
 class HDRProcessor:
@@ -91,27 +127,56 @@ class HDRProcessor:
     
     def __init__(self, preset: str = "balanced"):
         self.preset = preset
+        self.processing_mode = settings.processing_mode
         self.params = HDRParameters()
         self._update_from_preset(preset)
         
+        # Run the OpenCV-only stages on the GPU when an OpenCL device exists
+        self.use_opencl = settings.enable_gpu and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        
         # Create lookup tables for performance
         self._create_luts()
         
+        # Parameter-dependent LUTs, rebuilt only when their key changes
+        self._lut_cache: Dict[str, Tuple[Any, np.ndarray]] = {}
+        
+        # CLAHE objects keyed by (clip_limit, tile_grid)
+        self._clahe_cache: Dict[Tuple[float, Tuple[int, int]], Any] = {}
+        
+        # Intermediate frame buffers keyed by frame shape, reused across frames
+        self._buffers: Dict[Tuple[int, ...], Dict[str, np.ndarray]] = {}
+        self._hist_buf = np.empty((256, 1), dtype=np.float32)
+        
+        # Readings the parameters were last resolved from; telemetry changes far
+        # less often than frames arrive, so unchanged readings skip the lookups
+        self._applied_readings: Optional[Tuple[Optional[float], ...]] = None
+        
+        # Compile the JIT kernels now rather than on the first real frame
+        if NUMBA_AVAILABLE:
+            self._warm_up_kernels()
+        
         # Performance tracking
         self.frame_count = 0
         self.total_time = 0.0
         
+    def _warm_up_kernels(self):
+        """Run each JIT kernel once on a tiny frame with the real argument types"""
+        dummy = np.zeros((2, 2, 3), dtype=np.uint8)
+        adjust_highlights_shadows(dummy, 0.0, 0.0, np.empty_like(dummy))
+    
     def _update_from_preset(self, preset: str):
         """Update parameters from preset"""
-        if preset in HDR_PRESETS:
-            p = HDR_PRESETS[preset]
-            self.params.clahe_clip = p["clahe_clip"]
-            self.params.clahe_grid = p["clahe_grid"]
-            self.params.saturation = p["saturation_boost"]
-            self.params.sharpening = p["sharpening"]
-            self.params.tone_curve = p["tone_curve"]
-            if p.get("denoise"):
-                self.params.denoise_strength = p["denoise_strength"]
+        p = PRESETS.get(preset)
+        if p is not None:
+            self.params.clahe_clip = p.clahe_clip
+            self.params.clahe_grid = p.clahe_grid
+            self.params.saturation = p.saturation_boost
+            self.params.sharpening = p.sharpening
+            self.params.tone_curve = p.tone_curve
+            if p.denoise:
+                self.params.denoise_strength = p.denoise_strength
     
     def _create_luts(self):
         """Pre-calculate lookup tables for performance"""
@@ -132,6 +197,79 @@ class HDRProcessor:
         
         # Highlight compression LUT
         self.highlight_lut = self._create_highlight_lut()
+        
+        # S-curve composed with gamma encode, for frames where nothing
+        # between the tone curve and the re-encode touches the pixels
+        self.s_curve_encode_lut = self.gamma_encode[self.s_curve_lut]
+        
+        # Adaptive tone curve of the last frame that built one, for apply_cached_lut
+        self._last_adaptive_curve: Optional[np.ndarray] = None
+    
+    def _get_lut(self, name: str, key: Any, build: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return the cached LUT for name, rebuilding it if key changed"""
+        cached = self._lut_cache.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, build())
+            self._lut_cache[name] = cached
+        return cached[1]
+    
+    def _exposure_lut(self, exposure: float) -> np.ndarray:
+        """Saturating exposure gain as a uint8 LUT"""
+        return self._get_lut(
+            "exposure", exposure,
+            lambda: np.clip(np.arange(256) * exposure, 0, 255).astype(np.uint8)
+        )
+    
+    def _saturation_lut(self, saturation: float) -> np.ndarray:
+        """HSV LUT scaling S and passing H and V through"""
+        def build():
+            identity = np.arange(256, dtype=np.uint8)
+            s_lut = np.clip(np.arange(256) * saturation, 0, 255).astype(np.uint8)
+            return np.stack([identity, s_lut, identity], axis=-1).reshape(1, 256, 3)
+        return self._get_lut("saturation", saturation, build)
+    
+    def _decode_wb_lut(self, white_balance: Tuple[float, float, float]) -> np.ndarray:
+        """Gamma decode followed by per-channel white balance gains, as a BGR LUT"""
+        def build():
+            r_gain, g_gain, b_gain = white_balance
+            channels = [
+                np.clip(self.gamma_decode * gain, 0, 255).astype(np.uint8)
+                for gain in (b_gain, g_gain, r_gain)
+            ]
+            return np.stack(channels, axis=-1).reshape(1, 256, 3)
+        return self._get_lut("decode_wb", white_balance, build)
+    
+    def _get_buffers(self, shape: Tuple[int, ...]) -> Dict[str, np.ndarray]:
+        """Return the intermediate buffers for a frame shape, allocating on first use"""
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            plane = shape[:2]
+            buffers = {
+                "linear": np.empty(shape, dtype=np.uint8),
+                "lab": np.empty(shape, dtype=np.uint8),
+                "l": np.empty(plane, dtype=np.uint8),
+                "a": np.empty(plane, dtype=np.uint8),
+                "b": np.empty(plane, dtype=np.uint8),
+                "l_eq": np.empty(plane, dtype=np.uint8),
+                "gray": np.empty(plane, dtype=np.uint8),
+                "bgr": np.empty(shape, dtype=np.uint8),
+                "hsv": np.empty(shape, dtype=np.uint8),
+                "blur": np.empty(shape, dtype=np.uint8),
+                "sharp": np.empty(shape, dtype=np.uint8),
+                "hs_out": np.empty(shape, dtype=np.uint8),
+                "denoised": np.empty(shape, dtype=np.uint8),
+            }
+            self._buffers[shape] = buffers
+        return buffers
+    
+    def _get_clahe(self, clip_limit: float, tile_grid: Tuple[int, int]):
+        """Return a cached CLAHE object for the given parameters"""
+        key = (clip_limit, tuple(tile_grid))
+        clahe = self._clahe_cache.get(key)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=key[1])
+            self._clahe_cache[key] = clahe
+        return clahe
     
     def _create_highlight_lut(self, knee_point: float = 0.7) -> np.ndarray:
         """Create highlight compression LUT with knee"""
@@ -150,13 +288,15 @@ class HDRProcessor:
     
     def process_frame(self, 
                      frame: np.ndarray, 
-                     telemetry: Optional[TelemetryFrame] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+                     telemetry: Optional[TelemetryFrame] = None,
+                     out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
         """
         Process a single frame with HDR enhancement
         
         Args:
             frame: Input frame (BGR, uint8)
             telemetry: Current telemetry data
+            out: Optional buffer, same shape as frame, to write the result into
             
         Returns:
             Tuple of (processed_frame, metrics)
@@ -164,132 +304,270 @@ class HDRProcessor:
         start_time = time.perf_counter()
         
         # Update parameters from telemetry
-        if telemetry:
-            telemetry_values = telemetry.get_latest_values()
-            self.params.interpolate_from_telemetry(telemetry_values)
+        self.apply_telemetry(telemetry)
         
-        # 1. Gamma decode to linear space
-        linear = cv2.LUT(frame, self.gamma_decode)
+        return self._process(frame, out, start_time)
+    
+    def process_frame_raw(self,
+                          frame: np.ndarray,
+                          light: float,
+                          color_temp: float,
+                          motion: float,
+                          out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Process a single frame with telemetry passed as plain readings
         
-        # 2. Apply white balance in linear space
-        if self.params.white_balance != (1.0, 1.0, 1.0):
-            b, g, r = cv2.split(linear)
-            b = np.clip(b * self.params.white_balance[2], 0, 255).astype(np.uint8)
-            r = np.clip(r * self.params.white_balance[0], 0, 255).astype(np.uint8)
-            linear = cv2.merge([b, g, r])
+        Same as process_frame, for hot loops that already hold the values and
+        would otherwise build a TelemetryFrame only for it to be unpacked.
         
-        # 3. Convert to LAB for CLAHE
-        lab = cv2.cvtColor(linear, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
+        Args:
+            frame: Input frame (BGR, uint8)
+            light: Ambient light (lux)
+            color_temp: Color temperature (kelvin)
+            motion: Motion level (0-1)
+            out: Optional buffer, same shape as frame, to write the result into
+            
+        Returns:
+            Tuple of (processed_frame, metrics)
+        """
+        start_time = time.perf_counter()
         
-        # 4. Advanced CLAHE with telemetry-based parameters
-        clahe = cv2.createCLAHE(
-            clipLimit=self.params.clahe_clip,
-            tileGridSize=self.params.clahe_grid
-        )
-        l = clahe.apply(l)
+        # Update parameters from the readings
+        self.apply_readings(light, color_temp, motion)
         
-        # 5. Apply exposure adjustment
-        if self.params.exposure != 1.0:
-            l = np.clip(l * self.params.exposure, 0, 255).astype(np.uint8)
+        return self._process(frame, out, start_time)
+    
+    def _process(self, frame: np.ndarray, out: Optional[np.ndarray],
+                 start_time: float) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Steps 1-12 with the current parameters, shared by the process_frame variants"""
+        buf = self._get_buffers(frame.shape)
         
-        # 6. Merge and convert back
-        lab = cv2.merge([l, a, b])
-        bgr = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        # 1-6. Gamma decode, white balance and luminance CLAHE/exposure
+        if self.use_opencl:
+            bgr = self._equalize_opencl(frame)
+        else:
+            bgr = self._equalize(frame, buf)
+        
+        # 7-12. Tone mapping, color, detail and re-encode
+        final = self._finish(bgr, buf, out)
+        
+        return final, self._record_metrics(start_time)
+    
+    def apply_cached_lut(self,
+                         frame: np.ndarray,
+                         telemetry: Optional[TelemetryFrame] = None,
+                         out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Fast path reusing the last frame's tone curve
         
-        # 7. Apply tone curve
-        if self.params.tone_curve == "s_curve":
-            bgr = cv2.LUT(bgr, self.s_curve_lut)
-        elif self.params.tone_curve == "adaptive":
-            # Adaptive tone curve based on histogram
-            bgr = self._apply_adaptive_tone_curve(bgr)
+        Runs the same decode, CLAHE, exposure, tone curve, saturation and
+        highlight/shadow stages as process_frame, so brightness and color
+        match it. Only the stages that don't shift them are skipped: the
+        adaptive tone curve is not rebuilt from this frame's histogram, and
+        sharpening and denoise don't run.
+        
+        Args:
+            frame: Input frame (BGR, uint8)
+            telemetry: Current telemetry data
+            out: Optional buffer, same shape as frame, to write the result into
+            
+        Returns:
+            Tuple of (processed_frame, metrics)
+        """
+        start_time = time.perf_counter()
+        self.apply_telemetry(telemetry)
+        
+        buf = self._get_buffers(frame.shape)
+        if self.use_opencl:
+            bgr = self._equalize_opencl(frame)
+        else:
+            bgr = self._equalize(frame, buf)
+        final = self._finish(bgr, buf, out, reuse=True)
+        
+        return final, self._record_metrics(start_time)
+    
+    def apply_telemetry(self, telemetry: Optional[TelemetryFrame]):
+        """Update parameters from a telemetry frame (process_frame does this itself)"""
+        if not telemetry:
+            return
+        # Slot lookups; a missing reading comes back as None
+        self.apply_readings(
+            telemetry.get_value(TelemetryType.AMBIENT_LIGHT, None),
+            telemetry.get_value(TelemetryType.COLOR_TEMPERATURE, None),
+            telemetry.get_value(TelemetryType.MOTION, None)
+        )
+    
+    def apply_readings(self, light: Optional[float], color_temp: Optional[float],
+                       motion: Optional[float]):
+        """Update parameters from raw readings, unless they match the last ones applied"""
+        readings = (light, color_temp, motion)
+        if readings != self._applied_readings:
+            self.params.interpolate_from_readings(light, color_temp, motion)
+            self._applied_readings = readings
+    
+    def _finish(self, bgr: np.ndarray, buf: Dict[str, np.ndarray],
+                out: Optional[np.ndarray] = None, reuse: bool = False) -> np.ndarray:
+        """
+        Steps 7-12: tone curve, saturation, detail, highlights/shadows, denoise, re-encode
+        
+        With reuse, the adaptive tone curve from the last frame is kept and
+        steps 9 and 11 (sharpening, denoise) are skipped.
+        """
+        # Bind the per-frame parameters once
+        p = self.params
+        saturation, sharpening, tone_curve = p.saturation, p.sharpening, p.tone_curve
+        highlights, shadows, denoise_strength = p.highlights, p.shadows, p.denoise_strength
+        
+        # Decide once which stages do visible work
+        do_saturation = abs(saturation - 1.0) > _EPS
+        do_sharpening = sharpening > _EPS and not reuse
+        do_highlights_shadows = abs(highlights) > _EPS or abs(shadows) > _EPS
+        do_denoise = denoise_strength > 0 and not reuse
+        
+        # 7. Apply tone curve. It is a point transform, so when steps 8-11
+        # are all no-ops it is folded into the gamma re-encode LUT instead
+        fold_tone_curve = not (do_saturation or do_sharpening or do_highlights_shadows or do_denoise)
+        encode_lut = self.gamma_encode
+        if tone_curve == "s_curve":
+            if fold_tone_curve:
+                encode_lut = self.s_curve_encode_lut
+            else:
+                bgr = cv2.LUT(bgr, self.s_curve_lut, dst=bgr)
+        elif tone_curve == "adaptive":
+            # Adaptive tone curve based on histogram (or the last frame's)
+            if reuse and self._last_adaptive_curve is not None:
+                curve = self._last_adaptive_curve
+            else:
+                curve = self._adaptive_tone_curve_lut(bgr, buf["gray"])
+                self._last_adaptive_curve = curve
+            if fold_tone_curve:
+                encode_lut = self.gamma_encode[curve]
+            else:
+                bgr = cv2.LUT(bgr, curve, dst=bgr)
         
         # 8. Saturation boost in HSV
-        if self.params.saturation != 1.0:
-            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).astype(np.float32)
-            hsv[:, :, 1] *= self.params.saturation
-            hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
-            bgr = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
+        if do_saturation:
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV_FULL, dst=buf["hsv"])
+            hsv = cv2.LUT(hsv, self._saturation_lut(saturation), dst=hsv)
+            bgr = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR_FULL, dst=buf["bgr"])
         
         # 9. Detail enhancement (edge-aware)
-        if self.params.sharpening > 0:
-            bgr = self._enhance_details(bgr, self.params.sharpening)
+        if do_sharpening:
+            bgr = self._enhance_details(bgr, sharpening, buf["blur"], buf["sharp"])
         
         # 10. Highlight/shadow adjustment
-        if self.params.highlights != 0 or self.params.shadows != 0:
-            bgr = self._adjust_highlights_shadows(bgr)
+        if do_highlights_shadows:
+            bgr = self._adjust_highlights_shadows(bgr, buf["gray"], buf["hs_out"])
         
         # 11. Optional denoise
-        if self.params.denoise_strength > 0:
-            bgr = cv2.fastNlMeansDenoisingColored(
-                bgr, None, 
-                self.params.denoise_strength,
-                self.params.denoise_strength,
-                7, 21
-            )
-        
-        # 12. Gamma re-encode
-        final = cv2.LUT(bgr, self.gamma_encode)
+        if do_denoise:
+            bgr = self._denoise(bgr, denoise_strength, buf["denoised"])
         
-        # Calculate metrics
+        # 12. Gamma re-encode (with the tone curve folded in, see step 7)
+        return cv2.LUT(bgr, encode_lut, dst=out)
+    
+    def _record_metrics(self, start_time: float) -> Dict[str, Any]:
+        """Update performance counters and build the metrics dict"""
         process_time = (time.perf_counter() - start_time) * 1000  # ms
         self.frame_count += 1
         self.total_time += process_time
         
-        metrics = {
+        p = self.params
+        return {
             "process_time_ms": process_time,
             "avg_time_ms": self.total_time / self.frame_count,
             "params": {
-                "exposure": self.params.exposure,
-                "contrast": self.params.contrast,
-                "saturation": self.params.saturation,
-                "sharpening": self.params.sharpening
+                "exposure": p.exposure,
+                "contrast": p.contrast,
+                "saturation": p.saturation,
+                "sharpening": p.sharpening
             }
         }
-        
-        return final, metrics
     
-    def _enhance_details(self, img: np.ndarray, strength: float) -> np.ndarray:
-        """Edge-aware detail enhancement using guided filter"""
-        # Simple unsharp mask for now (can be replaced with guided filter)
-        gaussian = cv2.GaussianBlur(img, (0, 0), 2.0)
-        enhanced = cv2.addWeighted(img, 1.0 + strength, gaussian, -strength, 0)
-        return enhanced
-    
-    def _apply_adaptive_tone_curve(self, img: np.ndarray) -> np.ndarray:
-        """Apply adaptive tone curve based on image histogram"""
-        # Convert to grayscale for histogram
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-        hist = hist.flatten() / hist.sum()
+    def _equalize(self, frame: np.ndarray, buf: Dict[str, np.ndarray]) -> np.ndarray:
+        """Steps 1-6 on the CPU, writing into the reused frame buffers"""
+        # 1. Gamma decode to linear space
+        # 2. Apply white balance in linear space (folded into the decode LUT)
+        linear = cv2.LUT(frame, self._decode_wb_lut(self.params.white_balance), dst=buf["linear"])
         
-        # Calculate cumulative distribution
-        cdf = hist.cumsum()
+        # 3. Convert to LAB for CLAHE
+        lab = cv2.cvtColor(linear, cv2.COLOR_BGR2LAB, dst=buf["lab"])
+        l, a, b = cv2.split(lab, [buf["l"], buf["a"], buf["b"]])
+        
+        # 4. Advanced CLAHE with telemetry-based parameters
+        clahe = self._get_clahe(self.params.clahe_clip, self.params.clahe_grid)
+        l = clahe.apply(l, dst=buf["l_eq"])
         
-        # Create adaptive curve
-        curve = (cdf * 255).astype(np.uint8)
+        # 5. Apply exposure adjustment
+        if abs(self.params.exposure - 1.0) > _EPS:
+            l = cv2.LUT(l, self._exposure_lut(self.params.exposure), dst=l)
         
-        # Apply to each channel
-        return cv2.LUT(img, curve)
+        # 6. Merge and convert back
+        lab = cv2.merge([l, a, b], dst=lab)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=buf["bgr"])
     
-    def _adjust_highlights_shadows(self, img: np.ndarray) -> np.ndarray:
-        """Adjust highlights and shadows separately"""
-        # Convert to float
-        img_f = img.astype(np.float32) / 255.0
+    def _equalize_opencl(self, frame: np.ndarray) -> np.ndarray:
+        """Steps 1-6 through OpenCV's transparent API (OpenCL device)"""
+        umat = cv2.UMat(frame)
+        linear = cv2.LUT(umat, self._decode_wb_lut(self.params.white_balance))
+        
+        lab = cv2.cvtColor(linear, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        
+        clahe = self._get_clahe(self.params.clahe_clip, self.params.clahe_grid)
+        l = clahe.apply(l)
         
-        # Create masks
-        lum = cv2.cvtColor(img_f, cv2.COLOR_BGR2GRAY)
-        highlight_mask = np.clip((lum - 0.5) * 2, 0, 1)
-        shadow_mask = np.clip((0.5 - lum) * 2, 0, 1)
+        if abs(self.params.exposure - 1.0) > _EPS:
+            l = cv2.LUT(l, self._exposure_lut(self.params.exposure))
         
-        # Apply adjustments
-        if self.params.highlights != 0:
-            adjustment = 1 + self.params.highlights * highlight_mask[:, :, np.newaxis]
-            img_f *= adjustment
+        lab = cv2.merge([l, a, b])
+        
+        # Download once; the remaining steps mix in NumPy code
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR).get()
+    
+    def _enhance_details(self, img: np.ndarray, strength: float,
+                         blur: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Edge-aware detail enhancement using guided filter"""
+        # Simple unsharp mask for now (can be replaced with guided filter)
+        gaussian = cv2.GaussianBlur(img, (0, 0), 2.0, dst=blur)
+        return cv2.addWeighted(img, 1.0 + strength, gaussian, -strength, 0, dst=out)
+    
+    def _denoise(self, img: np.ndarray, strength: int, out: np.ndarray) -> np.ndarray:
+        """Denoise with non-local means in QUALITY mode, bilateral filter otherwise"""
+        if self.processing_mode == ProcessingMode.QUALITY:
+            return cv2.fastNlMeansDenoisingColored(img, out, strength, strength, 7, 21)
         
-        if self.params.shadows != 0:
-            adjustment = 1 + self.params.shadows * shadow_mask[:, :, np.newaxis]
-            img_f *= adjustment
+        # Edge-preserving and an order of magnitude cheaper than NLM
+        return cv2.bilateralFilter(img, 5, strength * 5, 5, dst=out)
+    
+    def _adaptive_tone_curve_lut(self, img: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        """Build an adaptive tone curve LUT from the image histogram"""
+        # Convert to grayscale for histogram
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=gray)
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256], hist=self._hist_buf).ravel()
         
-        # Convert back
-        return np.clip(img_f * 255, 0, 255).astype(np.uint8)
\ No newline at end of file
+        # Cumulative distribution scaled straight to 0-255
+        cdf = np.cumsum(hist)
+        return (cdf * (255.0 / cdf[-1])).astype(np.uint8)
+    
+    def _adjust_highlights_shadows(self, img: np.ndarray, gray: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Adjust highlights and shadows separately"""
+        highlights, shadows = float(self.params.highlights), float(self.params.shadows)
+        if NUMBA_AVAILABLE:
+            # Fused kernel, writing into the reused output buffer
+            adjust_highlights_shadows(img, highlights, shadows, out)
+            return out
+        
+        # Per-luminance gain, in 1/64 fixed point so the pass stays uint8
+        def build():
+            lum = np.arange(256) / 255.0
+            highlight_mask = np.clip((lum - 0.5) * 2, 0, 1)
+            shadow_mask = np.clip((0.5 - lum) * 2, 0, 1)
+            gain = (1 + highlights * highlight_mask) * (1 + shadows * shadow_mask)
+            return np.clip(np.round(gain * 64), 0, 255).astype(np.uint8)
+        gain_lut = self._get_lut("highlights_shadows", (highlights, shadows), build)
+        
+        lum = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=gray)
+        gain = cv2.LUT(lum, gain_lut, dst=lum)
+        gain = cv2.cvtColor(gain, cv2.COLOR_GRAY2BGR, dst=out)
+        return cv2.multiply(img, gain, dst=out, scale=1 / 64)
@@ -0,0 +1,20 @@
+"""
+GPL JIT Helpers
+Optional Numba acceleration for per-pixel kernels
+"""
+
+try:
+    from numba import njit, prange, set_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def set_num_threads(n: int):
+        """No-op stand-in for numba.set_num_threads when Numba is not installed"""
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,32 @@
+"""
+GPL JPEG Helpers
+JPEG encoding through libjpeg-turbo when available, OpenCV otherwise
+"""
+
+import cv2
+import numpy as np
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    # Loads libjpeg-turbo; raises OSError if the shared library is missing
+    _TURBOJPEG = TurboJPEG()
+except (ImportError, OSError):
+    _TURBOJPEG = None
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 80) -> bytes:
+    """
+    JPEG-encode a BGR frame, with libjpeg-turbo's SIMD encoder when installed
+    
+    Args:
+        frame: Input frame (BGR, uint8)
+        quality: JPEG quality, 0-100
+    
+    Returns:
+        Encoded JPEG bytes
+    """
+    if _TURBOJPEG is not None:
+        return _TURBOJPEG.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+    
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
@@ -0,0 +1,368 @@
+"""
+GPL Video Utilities
+Capture and writer helpers that prefer hardware-accelerated decode/encode
+"""
+
+import functools
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from typing import Any, Callable, List, Optional, Set, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+def _has_gstreamer() -> bool:
+    """Check whether this OpenCV build includes the GStreamer backend"""
+    for line in cv2.getBuildInformation().splitlines():
+        if line.strip().startswith("GStreamer:"):
+            return "YES" in line
+    return False
+
+
+HAS_GSTREAMER = _has_gstreamer()
+FFMPEG_PATH = shutil.which("ffmpeg")
+
+
+def open_capture(source: str) -> cv2.VideoCapture:
+    """
+    Open a video source, decoding on the GPU/fixed-function block when possible
+    
+    Args:
+        source: "webcam" or a video file path
+        
+    Returns:
+        An opened (or, if nothing could open it, unopened) VideoCapture
+    """
+    if source == "webcam":
+        # Keep only the newest frame queued, so a live feed never lags behind
+        cap = cv2.VideoCapture(0)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+    
+    # GStreamer: decodebin picks the highest ranked decoder, which is the
+    # hardware one (nvv4l2decoder, vaapi, vtdec) when its plugin is installed
+    if HAS_GSTREAMER:
+        pipeline = (
+            f'filesrc location="{source}" ! decodebin ! videoconvert ! '
+            'video/x-raw,format=BGR ! appsink sync=false'
+        )
+        cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        if cap.isOpened():
+            return cap
+    
+    # FFmpeg: any available hardware decoder (VAAPI, D3D11, VideoToolbox...),
+    # falling back to software decode inside OpenCV
+    cap = cv2.VideoCapture(
+        source, cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    )
+    if cap.isOpened():
+        return cap
+    
+    return cv2.VideoCapture(source)
+
+
+def read_into(cap: cv2.VideoCapture, buf: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+    """
+    Read the next frame, decoding into buf when it has the right shape
+    
+    Args:
+        cap: Opened capture to decode from
+        buf: Frame from a previous read to reuse, or None to allocate
+        
+    Returns:
+        Tuple of (success, frame); frame is buf when it could be reused
+    """
+    if not cap.grab():
+        return False, None
+    return cap.retrieve(buf)
+
+
+# GStreamer H.264 encoders in order of preference: NVIDIA, macOS, Intel/AMD
+_GST_H264_ENCODERS = (
+    "nvv4l2h264enc bitrate=20000000",
+    "vtenc_h264_hw bitrate=20000",
+    "vaapih264enc bitrate=20000",
+)
+
+
+# ffmpeg H.264 encoders in order of preference, with their rate options
+_FFMPEG_H264_ENCODERS = (
+    ("h264_nvenc", ["-preset", "p1", "-b:v", "20M"]),
+    ("h264_videotoolbox", ["-b:v", "20M"]),
+    ("libx264", ["-preset", "ultrafast", "-crf", "23"]),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_h264_encoder() -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """Pick the first ffmpeg H.264 encoder that can actually encode on this machine"""
+    for name, options in _FFMPEG_H264_ENCODERS:
+        # Listed encoders can still lack their device, so encode one tiny frame
+        probe = [
+            FFMPEG_PATH, "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "color=size=256x256", "-frames:v", "1",
+            "-c:v", name, "-f", "null", "-"
+        ]
+        try:
+            if subprocess.run(probe, capture_output=True, timeout=10).returncode == 0:
+                return name, tuple(options)
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return None
+
+
+class FFmpegWriter:
+    """
+    VideoWriter-compatible writer piping raw BGR frames into an ffmpeg process
+    
+    Frames go straight from their ndarray to ffmpeg's stdin without an
+    intermediate copy, and ffmpeg handles encode and muxing. Unlike
+    cv2.VideoWriter, a failed write or encode raises RuntimeError instead
+    of leaving a broken file behind silently.
+    """
+    
+    def __init__(self, path: str, fps: float, size: Tuple[int, int],
+                 encoder: str = "libx264", options: Tuple[str, ...] = ()):
+        width, height = size
+        self._path = path
+        self._process = None
+        
+        # ffmpeg only opens the output once the first frame arrives, so an
+        # unwritable destination is caught here rather than as a broken pipe
+        if not os.access(os.path.dirname(os.path.abspath(path)), os.W_OK):
+            return
+        
+        # yuv420p subsamples chroma 2x2, so odd sizes get one padded edge
+        pad = []
+        if width % 2 or height % 2:
+            pad = ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        command = [
+            FFMPEG_PATH, "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-",
+            *pad, "-c:v", encoder, *options, "-pix_fmt", "yuv420p", path
+        ]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    
+    def isOpened(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(frame)))
+        except OSError as exc:
+            self._process.wait()
+            raise RuntimeError(
+                f"ffmpeg exited with code {self._process.returncode} "
+                f"while writing {self._path}"
+            ) from exc
+    
+    def release(self):
+        if self._process is None:
+            return
+        if self._process.stdin and not self._process.stdin.closed:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                # Already dead; its exit code below says why
+                pass
+        if self._process.wait() != 0:
+            raise RuntimeError(
+                f"ffmpeg exited with code {self._process.returncode} "
+                f"encoding {self._path}"
+            )
+
+
+def open_writer(path: str, fps: float, size: Tuple[int, int],
+                fallback_fourcc: str = "mp4v") -> Union[FFmpegWriter, cv2.VideoWriter]:
+    """
+    Open an H.264 video writer, encoding on the GPU/fixed-function block when possible
+    
+    Args:
+        path: Output file path
+        fps: Output frame rate
+        size: Frame (width, height)
+        fallback_fourcc: Codec for the software writer used as a last resort
+        
+    Returns:
+        An opened (or, if nothing could open it, unopened) writer
+    """
+    # ffmpeg pipe: no per-frame copy into OpenCV's buffers, and the best
+    # encoder ffmpeg can run here (hardware first, then libx264 ultrafast)
+    if FFMPEG_PATH:
+        encoder = _ffmpeg_h264_encoder()
+        if encoder is not None:
+            writer = FFmpegWriter(path, fps, size, *encoder)
+            if writer.isOpened():
+                return writer
+    
+    # GStreamer: opening fails when the encoder's plugin isn't installed,
+    # so probing is just trying each one
+    if HAS_GSTREAMER:
+        for encoder in _GST_H264_ENCODERS:
+            pipeline = (
+                f'appsrc ! videoconvert ! {encoder} ! h264parse ! mp4mux ! '
+                f'filesink location="{path}"'
+            )
+            writer = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, fps, size, True)
+            if writer.isOpened():
+                return writer
+    
+    # FFmpeg: any available hardware encoder
+    writer = cv2.VideoWriter(
+        path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*"avc1"), fps, size,
+        [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    )
+    if writer.isOpened():
+        return writer
+    
+    return cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fallback_fourcc), fps, size)
+
+
+def _core_classes() -> Tuple[Set[int], Set[int]]:
+    """
+    Split the CPUs this process may run on into (performance, efficiency) cores
+    
+    Cores are told apart by cpufreq's cpuinfo_max_freq, so a machine with
+    identical cores (or no cpufreq) reports everything as performance.
+    """
+    allowed = os.sched_getaffinity(0)
+    max_freqs = {}
+    for cpu in allowed:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/cpufreq/cpuinfo_max_freq") as f:
+                max_freqs[cpu] = int(f.read())
+        except (OSError, ValueError):
+            return set(allowed), set()
+    
+    top = max(max_freqs.values())
+    performance = {cpu for cpu, freq in max_freqs.items() if freq == top}
+    return performance, set(allowed) - performance
+
+
+def _pin_current_thread(cpus: Set[int]):
+    """Restrict the calling thread to cpus (on Linux pid 0 means this thread)"""
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+
+def run_pipeline(cap: cv2.VideoCapture,
+                 writer: Union[FFmpegWriter, cv2.VideoWriter, Any],
+                 process: Callable[[int, np.ndarray, np.ndarray], Any],
+                 queue_size: int = 4,
+                 pin_threads: bool = False) -> int:
+    """
+    Decode, process and encode on separate threads joined by bounded queues
+    
+    OpenCV releases the GIL in read/write and in most processing calls, so
+    the three stages overlap. Processing runs on the calling thread.
+    
+    Args:
+        cap: Opened capture to decode from
+        writer: Opened writer to encode into; anything with write() works,
+            since it is only handed what process returns
+        process: Called as process(frame_index, frame, out) and returns the
+            frame to write; out is a reusable buffer the result may go into
+        queue_size: Frames buffered between stages
+        pin_threads: Keep processing on the performance cores and, on hybrid
+            CPUs, decode/encode on the efficiency cores, so the scheduler
+            doesn't migrate them (and their cache) around. Needs
+            os.sched_setaffinity; ignored where it is missing
+        
+    Returns:
+        Number of frames processed
+    """
+    # Processing gets the whole performance set rather than one core, since
+    # OpenCV's worker threads inherit the affinity of the thread creating them
+    pin_threads = pin_threads and hasattr(os, "sched_setaffinity")
+    if pin_threads:
+        original_affinity = os.sched_getaffinity(0)
+        performance_cores, efficiency_cores = _core_classes()
+        _pin_current_thread(performance_cores)
+    else:
+        efficiency_cores = set()
+
+    decoded: queue.Queue = queue.Queue(maxsize=queue_size)
+    enhanced: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    
+    # Input ring: queued frames + one being processed + one being decoded
+    inputs = [None] * (queue_size + 2)
+    
+    def decode():
+        _pin_current_thread(efficiency_cores)
+        try:
+            slot = 0
+            while not stop.is_set():
+                ret, frame = read_into(cap, inputs[slot])
+                if not ret:
+                    break
+                inputs[slot] = frame
+                slot = (slot + 1) % len(inputs)
+                decoded.put(frame)
+        finally:
+            decoded.put(None)
+    
+    # Set by the encoder if the writer raises (e.g. BrokenPipeError from a
+    # dead ffmpeg), and re-raised on the calling thread once it is joined
+    encode_error: List[BaseException] = []
+    
+    def encode():
+        _pin_current_thread(efficiency_cores)
+        try:
+            while (frame := enhanced.get()) is not None:
+                writer.write(frame)
+        except BaseException as exc:
+            encode_error.append(exc)
+            stop.set()
+    
+    def hand_to_encoder(item) -> bool:
+        """Queue item for the encoder; False once the encoder has died"""
+        while encoder.is_alive():
+            try:
+                enhanced.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    decoder = threading.Thread(target=decode, name="gpl-decode", daemon=True)
+    encoder = threading.Thread(target=encode, name="gpl-encode", daemon=True)
+    decoder.start()
+    encoder.start()
+    
+    # Output ring: queued frames + one being encoded + one being processed,
+    # so a buffer is never rewritten before the encoder is done with it
+    outputs = []
+    frame_count = 0
+    try:
+        while (frame := decoded.get()) is not None:
+            if not outputs:
+                outputs = [np.empty_like(frame) for _ in range(queue_size + 2)]
+            result = process(frame_count, frame, outputs[frame_count % len(outputs)])
+            if not hand_to_encoder(result):
+                break
+            frame_count += 1
+    finally:
+        # Unblock the decoder if processing stopped early, then drain
+        stop.set()
+        while decoder.is_alive():
+            try:
+                decoded.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        hand_to_encoder(None)
+        encoder.join()
+        
+        if pin_threads:
+            # The calling thread may be a pooled worker; give it back its CPUs
+            os.sched_setaffinity(0, original_affinity)
+    
+    if encode_error:
+        raise encode_error[0]
+    return frame_count
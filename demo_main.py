@@ -9,15 +9,52 @@ import numpy as np
 from pathlib import Path
 import time
 import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 # Add the current directory to Python path
 sys.path.insert(0, '.')
 
 from config.settings import settings
 from core.processors.hdr_processor import HDRProcessor
+from telemetry.base import TelemetryType
 from telemetry.collectors.system_telemetry import SystemTelemetryCollector
 
 
+def _generate_demo_frames(frames: queue.Queue, errors: List[BaseException], count: int = 150):
+    """
+    Producer: render gradient frames into the queue, then a None sentinel
+    
+    The sentinel is queued even if rendering fails, with the exception
+    added to errors for the consumer to re-raise.
+    """
+    try:
+        # Gradient ramps are the same every frame, so build them once
+        red_ramp = (np.arange(1920) * 255 // 1920).astype(np.uint8)
+        green_ramp = (np.arange(1080) * 255 // 1080).astype(np.uint8)
+        
+        for frame_num in range(count):
+            # Create gradient frame
+            frame = np.empty((1080, 1920, 3), dtype=np.uint8)
+            
+            # Add color gradients
+            frame[..., 0] = red_ramp[np.newaxis, :]  # Red gradient
+            frame[..., 1] = green_ramp[:, np.newaxis]  # Green gradient
+            frame[..., 2] = 255 * (frame_num % 60) // 60  # Blue pulse
+            
+            # Add text
+            cv2.putText(frame, f"GPL Demo Frame {frame_num}", (50, 100),
+                       cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+            
+            frames.put(frame)
+    except BaseException as exc:
+        errors.append(exc)
+    finally:
+        frames.put(None)
+
+
 async def create_demo_video():
     """Create a simple demo video if none exists"""
     demo_path = Path("data/samples/demo_video.mp4")
@@ -29,26 +66,33 @@ async def create_demo_video():
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
         out = cv2.VideoWriter(str(demo_path), fourcc, 30.0, (1920, 1080))
         
-        for frame_num in range(150):  # 5 seconds at 30fps
-            # Create gradient frame
-            frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
-            
-            # Add color gradients
-            for y in range(1080):
-                for x in range(1920):
-                    frame[y, x] = [
-                        int(255 * (x / 1920)),  # Red gradient
-                        int(255 * (y / 1080)),  # Green gradient
-                        int(255 * ((frame_num % 60) / 60))  # Blue pulse
-                    ]
-            
-            # Add text
-            cv2.putText(frame, f"GPL Demo Frame {frame_num}", (50, 100),
-                       cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
-            
-            out.write(frame)
+        # Render the next frame on a generator thread while this one encodes
+        frames: queue.Queue = queue.Queue(maxsize=2)
+        errors: List[BaseException] = []
+        generator = threading.Thread(
+            target=_generate_demo_frames, args=(frames, errors, 150), daemon=True  # 5 seconds at 30fps
+        )
+        generator.start()
+        
+        try:
+            try:
+                while (frame := frames.get()) is not None:
+                    out.write(frame)
+            finally:
+                # If writing failed, unblock the generator so it can finish
+                while generator.is_alive():
+                    try:
+                        frames.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                out.release()
+            if errors:
+                raise errors[0]
+        except BaseException:
+            # Don't leave a truncated video behind to be picked up next run
+            demo_path.unlink(missing_ok=True)
+            raise
         
-        out.release()
         print(f"Demo video created: {demo_path}")
     
     return str(demo_path)
@@ -98,20 +142,40 @@ async def run_demo():
     frame_count = 0
     start_time = time.time()
     
-    try:
+    # Decode -> process -> encode pipeline. Bounded queues let cap.read and
+    # out.write (both release the GIL) overlap with HDR processing
+    loop = asyncio.get_running_loop()
+    io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gpl-io")
+    decoded: asyncio.Queue = asyncio.Queue(maxsize=4)
+    enhanced: asyncio.Queue = asyncio.Queue(maxsize=4)
+    
+    async def read_frames():
         while True:
-            ret, frame = cap.read()
+            ret, frame = await loop.run_in_executor(io_pool, cap.read)
             if not ret:
                 break
-            
-            # Get current telemetry
-            telemetry = await telemetry_collector.get_current_telemetry()
+            await decoded.put(frame)
+        await decoded.put(None)
+    
+    async def write_frames():
+        while (frame := await enhanced.get()) is not None:
+            await loop.run_in_executor(io_pool, out.write, frame)
+    
+    reader = asyncio.create_task(read_frames())
+    writer = asyncio.create_task(write_frames())
+    
+    try:
+        while (frame := await decoded.get()) is not None:
+            # Latest telemetry, kept fresh by the collector's background task
+            telemetry = telemetry_collector.current_frame
             
             # Process frame
-            enhanced_frame, metrics = hdr_processor.process_frame(frame, telemetry)
+            enhanced_frame, metrics = await loop.run_in_executor(
+                None, hdr_processor.process_frame, frame, telemetry
+            )
             
-            # Write output
-            out.write(enhanced_frame)
+            # Queue for writing
+            await enhanced.put(enhanced_frame)
             
             frame_count += 1
             
@@ -122,16 +186,24 @@ async def run_demo():
                 progress = (frame_count / total_frames) * 100
                 
                 if telemetry:
-                    light = telemetry.get_value(telemetry.data.get(list(telemetry.data.keys())[0]).type) if telemetry.data else 0
+                    light = telemetry.get_value(TelemetryType.AMBIENT_LIGHT)
                     print(f"Progress: {progress:.1f}% | FPS: {fps_actual:.1f} | "
                           f"Latency: {metrics['process_time_ms']:.1f}ms | "
                           f"Light: {light:.0f} lux")
                 else:
                     print(f"Progress: {progress:.1f}% | FPS: {fps_actual:.1f} | "
                           f"Latency: {metrics['process_time_ms']:.1f}ms")
+        
+        # Flush the writer
+        await enhanced.put(None)
+        await writer
     
     finally:
         # Cleanup
+        reader.cancel()
+        writer.cancel()
+        await asyncio.gather(reader, writer, return_exceptions=True)
+        io_pool.shutdown(wait=True)
         cap.release()
         out.release()
         await telemetry_collector.stop()
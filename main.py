@@ -4,130 +4,47 @@ Main application entry point
 """
 
 import asyncio
+import gzip
+import importlib.util
+import os
+import re
+import sys
 import uvicorn
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, Request, WebSocket
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-import cv2
+from fastapi.responses import HTMLResponse, Response
 import numpy as np
 from pathlib import Path
-import json
+import orjson
 
 from config.settings import settings
 from core.processors.hdr_processor import HDRProcessor
+from core.utils.video import open_capture, read_into
+from telemetry.base import TelemetryType
 from telemetry.collectors.system_telemetry import SystemTelemetryCollector
 from telemetry.sensors.simulated import SimulatedSensors
 from web.api.routes import api_router
 from web.streaming.webrtc_server import WebRTCServer
 
 
-class GPLApplication:
-    """Main GPL Application"""
-    
-    def __init__(self):
-        self.app = FastAPI(
-            title=settings.app_name,
-            version=settings.app_version,
-            debug=settings.debug
-        )
-        
-        # Core components
-        self.hdr_processor = HDRProcessor(preset=settings.hdr_quality_preset)
-        self.telemetry_collector = SystemTelemetryCollector()
-        self.stream_server = WebRTCServer()
-        
-        # Setup routes and middleware
-        self._setup_routes()
-        self._setup_websocket()
-        
-        # State
-        self.is_processing = False
-        self.current_source = None
-        
-    def _setup_routes(self):
-        """Setup API routes"""
-        self.app.include_router(api_router, prefix="/api")
-        
-        # Serve static files
-        static_dir = Path("web/static")
-        if static_dir.exists():
-            self.app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-        
-        @self.app.get("/")
-        async def root():
-            return HTMLResponse(self._get_index_html())
-    
-    def _setup_websocket(self):
-        """Setup WebSocket endpoints"""
-        
-        @self.app.websocket("/ws")
-        async def websocket_endpoint(websocket: WebSocket):
-            await websocket.accept()
-            
-            try:
-                while True:
-                    # Send telemetry updates
-                    telemetry = await self.telemetry_collector.get_current_telemetry()
-                    await websocket.send_json({
-                        "type": "telemetry",
-                        "data": telemetry.to_dict() if telemetry else {}
-                    })
-                    
-                    # Send processing metrics
-                    if self.is_processing:
-                        await websocket.send_json({
-                            "type": "metrics",
-                            "data": {
-                                "fps": self.hdr_processor.frame_count,
-                                "latency": self.hdr_processor.total_time / max(1, self.hdr_processor.frame_count)
-                            }
-                        })
-                    
-                    await asyncio.sleep(0.1)  # 10Hz updates
-                    
-            except Exception as e:
-                print(f"WebSocket error: {e}")
-    
-    async def start_processing(self, source: str):
-        """Start HDR processing on video source"""
-        self.is_processing = True
-        self.current_source = source
-        
-        # Start telemetry collection
-        await self.telemetry_collector.start()
-        
-        # Open video source
-        if source == "webcam":
-            cap = cv2.VideoCapture(0)
-        else:
-            cap = cv2.VideoCapture(source)
-        
-        try:
-            while self.is_processing:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Get current telemetry
-                telemetry = await self.telemetry_collector.collect_frame()
-                
-                # Process frame
-                processed, metrics = self.hdr_processor.process_frame(frame, telemetry)
-                
-                # Stream processed frame
-                await self.stream_server.send_frame(processed)
-                
-                # Small delay to control frame rate
-                await asyncio.sleep(1.0 / settings.target_fps)
-                
-        finally:
-            cap.release()
-            await self.telemetry_collector.stop()
-            self.is_processing = False
-    
-    def _get_index_html(self) -> str:
-        """Generate index HTML"""
-        return """
+# uvloop is not available on Windows
+EVENT_LOOP = "uvloop" if sys.platform != "win32" else "asyncio"
+
+
+def _io_uring_available() -> bool:
+    """Whether uringcore is installed and the kernel is Linux 5.11 or newer"""
+    if not sys.platform.startswith("linux") or importlib.util.find_spec("uringcore") is None:
+        return False
+    match = re.match(r"(\d+)\.(\d+)", os.uname().release)
+    return bool(match) and (int(match.group(1)), int(match.group(2))) >= (5, 11)
+
+
+# io_uring-backed loop where supported, uvloop otherwise
+IO_URING_LOOP = _io_uring_available()
+
+
+# Index page, encoded once at import
+_INDEX_HTML = b"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -285,13 +202,15 @@ class GPLApplication:
         const ws = new WebSocket('ws://localhost:8000/ws');
         const status = document.getElementById('status');
         
-        ws.onmessage = (event) => {
-            const data = JSON.parse(event.data);
+        ws.onmessage = async (event) => {
+            // Updates arrive as binary frames (a Blob) of UTF-8 JSON
+            const data = JSON.parse(await event.data.text());
             
-            if (data.type === 'telemetry') {
-                updateTelemetry(data.data);
-            } else if (data.type === 'metrics') {
-                updateMetrics(data.data);
+            if (data.type === 'update') {
+                updateTelemetry(data.telemetry);
+                if (data.metrics) {
+                    updateMetrics(data.metrics);
+                }
             }
         };
         
@@ -350,7 +269,158 @@ class GPLApplication:
     </script>
 </body>
 </html>
-        """
+"""
+
+_INDEX_HTML_GZIP = gzip.compress(_INDEX_HTML, 9)
+
+
+class GPLApplication:
+    """Main GPL Application"""
+    
+    def __init__(self):
+        self.app = FastAPI(
+            title=settings.app_name,
+            version=settings.app_version,
+            debug=settings.debug
+        )
+        
+        # Core components
+        self.hdr_processor = HDRProcessor(preset=settings.hdr_quality_preset)
+        self.telemetry_collector = SystemTelemetryCollector()
+        self.stream_server = WebRTCServer()
+        
+        # Setup routes and middleware
+        self._setup_routes()
+        self._setup_websocket()
+        
+        # State
+        self.is_processing = False
+        self.current_source = None
+        self._ws_queues = set()
+        self._broadcast_task = None
+        
+    def _setup_routes(self):
+        """Setup API routes"""
+        self.app.include_router(api_router, prefix="/api")
+        
+        # Serve static files
+        static_dir = Path("web/static")
+        if static_dir.exists():
+            self.app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+        
+        @self.app.get("/")
+        async def root(request: Request):
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                return Response(
+                    content=_INDEX_HTML_GZIP,
+                    media_type="text/html",
+                    headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+                )
+            return HTMLResponse(content=_INDEX_HTML)
+    
+    def _setup_websocket(self):
+        """Setup WebSocket endpoints"""
+        
+        @self.app.websocket("/ws")
+        async def websocket_endpoint(websocket: WebSocket):
+            await websocket.accept()
+            
+            # Updates are produced once per tick by _broadcast_updates; each client
+            # only drains its own queue, so a slow client never stalls the others
+            queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+            self._ws_queues.add(queue)
+            if self._broadcast_task is None or self._broadcast_task.done():
+                self._broadcast_task = asyncio.create_task(self._broadcast_updates())
+            
+            try:
+                while True:
+                    await websocket.send_bytes(await queue.get())
+                    
+            except Exception as e:
+                print(f"WebSocket error: {e}")
+            finally:
+                self._ws_queues.discard(queue)
+    
+    async def _broadcast_updates(self):
+        """Encode one update per tick and hand it to every connected client"""
+        while self._ws_queues:
+            # Telemetry and processing metrics go out as one frame per tick
+            telemetry = self.telemetry_collector.get_current_telemetry()
+            payload = {
+                "type": "update",
+                "telemetry": telemetry.to_dict() if telemetry else {},
+                "metrics": {
+                    "fps": self.hdr_processor.frame_count,
+                    "latency": self.hdr_processor.total_time / max(1, self.hdr_processor.frame_count)
+                } if self.is_processing else None
+            }
+            message = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+            
+            for queue in list(self._ws_queues):
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # Client is behind: drop its oldest update rather than queue forever
+                    queue.get_nowait()
+                    queue.put_nowait(message)
+            
+            await asyncio.sleep(0.1)  # 10Hz updates
+    
+    async def start_processing(self, source: str):
+        """Start HDR processing on video source"""
+        self.is_processing = True
+        self.current_source = source
+        
+        # Start telemetry collection
+        await self.telemetry_collector.start()
+        
+        # Open video source (hardware decode when available)
+        cap = open_capture(source)
+        loop = asyncio.get_running_loop()
+        
+        # Webcams are paced to target_fps against a fixed deadline so sleeps
+        # don't accumulate drift; files run as fast as decode allows
+        frame_period = 1.0 / settings.target_fps if source == "webcam" else 0.0
+        next_deadline = loop.time()
+        
+        frame_index = 0
+        decode_buf = None
+        try:
+            while self.is_processing:
+                # Decode off the event loop so WebSocket/stream sends keep running
+                # (into the previous frame's array; it is done with by now)
+                ret, frame = await loop.run_in_executor(None, read_into, cap, decode_buf)
+                if not ret:
+                    break
+                decode_buf = frame
+                
+                # Get current telemetry (refreshed by the collector's background task)
+                telemetry = self.telemetry_collector.get_current_telemetry()
+                
+                # Process frame; under high motion, alternate frames reuse the last tone map
+                motion = telemetry.get_value(TelemetryType.MOTION) if telemetry else 0.0
+                if motion > settings.motion_skip_threshold and frame_index % 2 == 1:
+                    processed, metrics = self.hdr_processor.apply_cached_lut(frame, telemetry)
+                else:
+                    processed, metrics = self.hdr_processor.process_frame(frame, telemetry)
+                frame_index += 1
+                
+                # Stream processed frame
+                await self.stream_server.send_frame(processed)
+                
+                if frame_period:
+                    next_deadline += frame_period
+                    delay = next_deadline - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        # Behind schedule: restart from now rather than bursting to catch up
+                        next_deadline = loop.time()
+                
+        finally:
+            cap.release()
+            await self.telemetry_collector.stop()
+            self.is_processing = False
     
     async def run(self):
         """Run the application"""
@@ -358,7 +428,10 @@ class GPLApplication:
             self.app,
             host=settings.host,
             port=settings.port,
-            log_level=settings.log_level.lower()
+            log_level=settings.log_level.lower(),
+            loop=EVENT_LOOP,
+            http="httptools",
+            workers=1  # Stream and processing state live in this process
         )
         server = uvicorn.Server(config)
         await server.serve()
@@ -371,4 +444,11 @@ async def main():
 
 
 if __name__ == "__main__":
+    # serve() runs on our loop, not one uvicorn creates, so pick it here
+    if IO_URING_LOOP:
+        import uringcore
+        asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+    elif EVENT_LOOP == "uvloop":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file
@@ -5,7 +5,10 @@ import time
 
 sys.path.insert(0, '.')
 
+from config.settings import settings
 from core.processors.hdr_processor import HDRProcessor
+from core.utils.video import open_capture, open_writer, run_pipeline
+from telemetry.base import TelemetryType
 from telemetry.collectors.system_telemetry import SystemTelemetryCollector
 
 async def process_4k():
@@ -19,7 +22,7 @@ async def process_4k():
     print("Processing 4K video...")
     print(f"Input: {input_path}")
     
-    cap = cv2.VideoCapture(input_path)
+    cap = open_capture(input_path)
     fps = int(cap.get(cv2.CAP_PROP_FPS))
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -27,24 +30,28 @@ async def process_4k():
     
     print(f"Resolution: {width}x{height}, Total frames: {total_frames}")
     
-    fourcc = cv2.VideoWriter_fourcc(*'h264')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    # Hardware encoder when available; 4K software encode is slower than processing
+    out = open_writer(output_path, fps, (width, height), fallback_fourcc='h264')
     
-    frame_count = 0
     start_time = time.time()
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    def process(index, frame, scratch):
+        # Runs on the pipeline thread; the collector keeps current_frame fresh
+        telemetry = telemetry_collector.current_frame
         
-        telemetry = await telemetry_collector.get_current_telemetry()
-        enhanced_frame, metrics = hdr_processor.process_frame(frame, telemetry)
-        out.write(enhanced_frame)
+        # Under high motion, alternate frames reuse the last tone map
+        motion = telemetry.get_value(TelemetryType.MOTION) if telemetry else 0.0
+        if motion > settings.motion_skip_threshold and index % 2 == 1:
+            enhanced_frame, metrics = hdr_processor.apply_cached_lut(frame, telemetry, out=scratch)
+        else:
+            enhanced_frame, metrics = hdr_processor.process_frame(frame, telemetry, out=scratch)
         
-        frame_count += 1
-        if frame_count % 30 == 0:
-            print(f"Progress: {frame_count}/{total_frames} ({100*frame_count/total_frames:.1f}%)")
+        if (index + 1) % 30 == 0:
+            print(f"Progress: {index + 1}/{total_frames} ({100*(index + 1)/total_frames:.1f}%)")
+        return enhanced_frame
+    
+    # Decode, process and encode on separate threads, pinned to core classes
+    frame_count = await asyncio.to_thread(run_pipeline, cap, out, process, pin_threads=True)
     
     cap.release()
     out.release()
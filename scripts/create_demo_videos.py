@@ -18,9 +18,10 @@ sys.stderr = sys.__stderr__
 sys.path.insert(0, '.')  # Docker runs from /app
 
 from core.processors.hdr_processor import HDRProcessor
-from telemetry.base import TelemetryFrame, TelemetryData, TelemetryType
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from core.utils.video import open_writer, run_pipeline
+from telemetry.base import TelemetryType, TelemetryView
+from dataclasses import dataclass, field
+from typing import Dict, List
 
 
 @dataclass
@@ -30,6 +31,17 @@ class DemoProfile:
     description: str
     telemetry_sequence: List[Dict]
     
+    # Keyframe times and (light, color_temp, motion) rows, built from the sequence
+    times: np.ndarray = field(init=False, repr=False)
+    values: np.ndarray = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.times = np.array([point["time"] for point in self.telemetry_sequence], dtype=np.float64)
+        self.values = np.array(
+            [[point["light"], point["color_temp"], point["motion"]] for point in self.telemetry_sequence],
+            dtype=np.float64
+        )
+
 
 class DemoVideoCreator:
     """Creates demo videos with different telemetry profiles"""
@@ -94,56 +106,19 @@ class DemoVideoCreator:
             )
         }
     
-    def create_telemetry_frame(self, light: float, color_temp: float, motion: float) -> TelemetryFrame:
-        """Create a telemetry frame with specified values"""
-        frame = TelemetryFrame()
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.AMBIENT_LIGHT,
-            value=light,
-            unit="lux"
-        ))
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.COLOR_TEMPERATURE,
-            value=color_temp,
-            unit="kelvin"
-        ))
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.MOTION,
-            value=motion,
-            unit="normalized"
-        ))
-        
-        return frame
-    
-    def interpolate_telemetry(self, sequence: List[Dict], current_time: float) -> Tuple[float, float, float]:
-        """Interpolate telemetry values for current time"""
-        # Find the two points to interpolate between
-        prev = sequence[0]
-        next = sequence[0]
-        
-        for i in range(len(sequence) - 1):
-            if sequence[i]["time"] <= current_time <= sequence[i + 1]["time"]:
-                prev = sequence[i]
-                next = sequence[i + 1]
-                break
-            elif current_time > sequence[i + 1]["time"]:
-                prev = sequence[i + 1]
-                next = sequence[i + 1]
-        
-        # If same point, no interpolation needed
-        if prev["time"] == next["time"]:
-            return prev["light"], prev["color_temp"], prev["motion"]
-        
-        # Linear interpolation
-        t = (current_time - prev["time"]) / (next["time"] - prev["time"])
-        light = prev["light"] + t * (next["light"] - prev["light"])
-        color_temp = prev["color_temp"] + t * (next["color_temp"] - prev["color_temp"])
-        motion = prev["motion"] + t * (next["motion"] - prev["motion"])
-        
-        return light, color_temp, motion
+    def interpolate_telemetry(self, profile: DemoProfile, times: np.ndarray) -> np.ndarray:
+        """Interpolate telemetry values for each of the given times, as (light, color_temp, motion) rows"""
+        key_times, values = profile.times, profile.values
+        if len(key_times) == 1:
+            return np.repeat(values, len(times), axis=0)
+        
+        # Segment containing each time, clamped to the first/last one
+        i = np.clip(np.searchsorted(key_times, times, side="right"), 1, len(key_times) - 1)
+        t0, t1 = key_times[i - 1], key_times[i]
+        
+        # Linear interpolation, holding the end values outside the sequence
+        t = np.clip((times - t0) / (t1 - t0), 0.0, 1.0)[:, np.newaxis]
+        return values[i - 1] + t * (values[i] - values[i - 1])
     
     async def process_video(self, profile_name: str):
         """Process video with a specific profile"""
@@ -167,50 +142,48 @@ class DemoVideoCreator:
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         
-        # Create output writer - try direct MP4 with better quality
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
+        # Create output writer - hardware H.264 when available, mp4v otherwise
+        out = open_writer(str(output_path), fps, (width, height))
         
-        frame_count = 0
         start_time = time.time()
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Calculate current time in video
-            current_time = frame_count / fps
-            
-            # Get telemetry for this time
-            light, color_temp, motion = self.interpolate_telemetry(
-                profile.telemetry_sequence, current_time
-            )
-            
-            # Create telemetry frame
-            telemetry = self.create_telemetry_frame(light, color_temp, motion)
+        # Telemetry for every frame up front, one contiguous array per type
+        frame_times = np.arange(max(total_frames, 1)) / fps
+        series = self.interpolate_telemetry(profile, frame_times).astype(np.float32)
+        lights, color_temps, motions = (np.ascontiguousarray(column) for column in series.T)
+        telemetry = TelemetryView({
+            TelemetryType.AMBIENT_LIGHT: lights,
+            TelemetryType.COLOR_TEMPERATURE: color_temps,
+            TelemetryType.MOTION: motions
+        })
+        
+        def process(frame_index, frame, scratch):
+            # Point the view at this frame (frames past the reported count hold the last)
+            telemetry.index = min(frame_index, len(lights) - 1)
+            light, color_temp, motion = telemetry.ambient_light, telemetry.color_temperature, telemetry.motion
             
             # Process frame
             if profile_name == "standard":
                 # For standard, ignore telemetry (use fixed params)
-                enhanced_frame, metrics = processor.process_frame(frame, None)
+                enhanced_frame, metrics = processor.process_frame(frame, None, out=scratch)
             else:
                 # For others, use telemetry-driven adaptation
-                enhanced_frame, metrics = processor.process_frame(frame, telemetry)
-            
-            # Write frame
-            out.write(enhanced_frame)
-            
-            frame_count += 1
+                enhanced_frame, metrics = processor.process_frame(frame, telemetry, out=scratch)
             
             # Progress update
-            if frame_count % 30 == 0:
-                progress = (frame_count / total_frames) * 100
-                print(f"Progress: {progress:.1f}% | "
+            done = frame_index + 1
+            if done % 30 == 0:
+                progress = (done / total_frames) * 100
+                print(f"[{profile_name}] Progress: {progress:.1f}% | "
                       f"Light: {light:.0f} lux | "
                       f"Color: {color_temp:.0f}K | "
                       f"Motion: {motion*100:.0f}% | "
                       f"Latency: {metrics['process_time_ms']:.1f}ms", flush=True)
+            
+            return enhanced_frame
+        
+        # Decode, process and encode on separate threads
+        frame_count = await asyncio.to_thread(run_pipeline, cap, out, process)
         
         # Cleanup
         cap.release()
@@ -237,9 +210,12 @@ class DemoVideoCreator:
             print(f"  {Path(self.input_video).absolute()}")
             return
         
-        # Process each profile
-        for profile_name in ["standard", "light", "color", "motion"]:
-            await self.process_video(profile_name)
+        # Process all profiles concurrently; each has its own processor and
+        # file handles, and runs its pipeline threads outside the event loop
+        await asyncio.gather(*(
+            self.process_video(profile_name)
+            for profile_name in ["standard", "light", "color", "motion"]
+        ))
         
         print("\n" + "="*60)
         print("✅ ALL DEMOS COMPLETE!")
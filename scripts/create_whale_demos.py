@@ -6,6 +6,7 @@ Creates demo videos using whale footage for underwater adaptation showcase
 
 import asyncio
 import cv2
+import os
 import numpy as np
 from pathlib import Path
 import time
@@ -13,10 +14,13 @@ import sys
 
 sys.path.insert(0, '.')
 
+from concurrent.futures import ProcessPoolExecutor
+
 from core.processors.hdr_processor import HDRProcessor
-from telemetry.base import TelemetryFrame, TelemetryData, TelemetryType
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from core.utils.jit import set_num_threads
+from core.utils.video import open_writer, run_pipeline
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
 
 
 @dataclass
@@ -26,6 +30,65 @@ class WhaleProfile:
     description: str
     telemetry_sequence: List[Dict]
     
+    # Keyframe times and (light, color_temp, motion) rows, built from the sequence
+    times: np.ndarray = field(init=False, repr=False)
+    values: np.ndarray = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.times = np.array([point["time"] for point in self.telemetry_sequence], dtype=np.float64)
+        self.values = np.array(
+            [[point["light"], point["color_temp"], point["motion"]] for point in self.telemetry_sequence],
+            dtype=np.float64
+        )
+
+
+# Frames buffered between pipeline stages
+_QUEUE_SIZE = 4
+
+# Profiles rendered by create_all_demos
+_DEMO_PROFILES = ["standard", "depth", "underwater_color", "whale_motion"]
+
+# Cores one decode -> process -> encode chain keeps busy: the decode, process
+# and encode threads, plus the ffmpeg encoder behind the writer
+_CORES_PER_CHAIN = 4
+
+
+@dataclass
+class _WhaleRender:
+    """Per-profile state for one output of a shared decode"""
+    name: str
+    profile: WhaleProfile
+    output_path: Path
+    processor: HDRProcessor
+    writer: Any = None
+    # (light, color_temp, motion) for every frame, built before decoding starts
+    readings: List[List[float]] = field(default_factory=list)
+    # Output ring like run_pipeline's, so no frame is rewritten while queued
+    outputs: List[np.ndarray] = field(default_factory=list)
+
+
+class _FanOutWriter:
+    """Writes each frame of a per-profile result list to its own writer"""
+    
+    def __init__(self, writers: List[Any]):
+        self.writers = writers
+    
+    def write(self, frames: List[np.ndarray]):
+        for writer, frame in zip(self.writers, frames):
+            writer.write(frame)
+    
+    def release(self):
+        """Release every writer, then raise the first failure (if any)"""
+        error = None
+        for writer in self.writers:
+            try:
+                writer.release()
+            except Exception as exc:
+                if error is None:
+                    error = exc
+        if error is not None:
+            raise error
+
 
 class WhaleVideoCreator:
     """Creates whale demo videos with underwater-specific adaptations"""
@@ -87,68 +150,55 @@ class WhaleVideoCreator:
             )
         }
     
-    def create_telemetry_frame(self, light: float, color_temp: float, motion: float) -> TelemetryFrame:
-        """Create a telemetry frame with specified values"""
-        frame = TelemetryFrame()
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.AMBIENT_LIGHT,
-            value=light,
-            unit="lux"
-        ))
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.COLOR_TEMPERATURE,
-            value=color_temp,
-            unit="kelvin"
-        ))
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.MOTION,
-            value=motion,
-            unit="normalized"
-        ))
-        
-        return frame
-    
-    def interpolate_telemetry(self, sequence: List[Dict], current_time: float) -> Tuple[float, float, float]:
+    def interpolate_telemetry(self, profile: WhaleProfile, current_time: float) -> Tuple[float, float, float]:
         """Interpolate telemetry values for current time"""
-        prev = sequence[0]
-        next = sequence[0]
-        
-        for i in range(len(sequence) - 1):
-            if sequence[i]["time"] <= current_time <= sequence[i + 1]["time"]:
-                prev = sequence[i]
-                next = sequence[i + 1]
-                break
-            elif current_time > sequence[i + 1]["time"]:
-                prev = sequence[i + 1]
-                next = sequence[i + 1]
+        times, values = profile.times, profile.values
+        if len(times) == 1:
+            light, color_temp, motion = values[0]
+            return float(light), float(color_temp), float(motion)
         
-        if prev["time"] == next["time"]:
-            return prev["light"], prev["color_temp"], prev["motion"]
+        # Segment containing current_time, clamped to the first/last one
+        i = int(np.clip(np.searchsorted(times, current_time, side="right"), 1, len(times) - 1))
+        t0, t1 = times[i - 1], times[i]
         
-        # Linear interpolation
-        t = (current_time - prev["time"]) / (next["time"] - prev["time"])
-        light = prev["light"] + t * (next["light"] - prev["light"])
-        color_temp = prev["color_temp"] + t * (next["color_temp"] - prev["color_temp"])
-        motion = prev["motion"] + t * (next["motion"] - prev["motion"])
+        # Linear interpolation, holding the end values outside the sequence
+        t = min(max((current_time - t0) / (t1 - t0), 0.0), 1.0)
+        light, color_temp, motion = values[i - 1] + t * (values[i] - values[i - 1])
         
-        return light, color_temp, motion
+        return float(light), float(color_temp), float(motion)
+    
+    def interpolate_timeline(self, profile: WhaleProfile, times: np.ndarray) -> np.ndarray:
+        """Interpolate (light, color_temp, motion) rows for an array of times"""
+        # np.interp holds the end values outside the sequence, like interpolate_telemetry
+        return np.stack(
+            [np.interp(times, profile.times, profile.values[:, column]) for column in range(3)],
+            axis=1
+        )
     
     async def process_video(self, profile_name: str):
         """Process video with a specific profile"""
-        profile = self.profiles[profile_name]
-        output_path = self.output_dir / f"whale_{profile_name}_adaptation.mp4"
-        
-        print(f"\n{'='*60}")
-        print(f"Creating {profile.name} Demo (Whale)")
-        print(f"Description: {profile.description}")
-        print(f"Output: {output_path}")
-        print(f"{'='*60}\n")
-        
-        # Initialize processor
-        processor = HDRProcessor(preset="balanced")
+        await self.process_videos([profile_name])
+    
+    async def process_videos(self, profile_names: List[str]):
+        """Process video with several profiles from a single decode"""
+        renders = []
+        for profile_name in profile_names:
+            profile = self.profiles[profile_name]
+            output_path = self.output_dir / f"whale_{profile_name}_adaptation.mp4"
+            
+            print(f"\n{'='*60}")
+            print(f"Creating {profile.name} Demo (Whale)")
+            print(f"Description: {profile.description}")
+            print(f"Output: {output_path}")
+            print(f"{'='*60}\n")
+            
+            # Initialize processor
+            renders.append(_WhaleRender(
+                name=profile_name,
+                profile=profile,
+                output_path=output_path,
+                processor=HDRProcessor(preset="balanced")
+            ))
         
         # Open video
         cap = cv2.VideoCapture(self.input_video)
@@ -157,61 +207,77 @@ class WhaleVideoCreator:
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         
-        # Create output writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
+        # Create output writers - ffmpeg pipe / hardware H.264 when available, mp4v otherwise
+        for render in renders:
+            render.writer = open_writer(str(render.output_path), fps, (width, height))
+        
+        # The whole timeline is known up front, so interpolate every frame at once
+        frame_times = np.arange(max(total_frames, 0)) / fps
+        for render in renders:
+            render.readings = self.interpolate_timeline(render.profile, frame_times).tolist()
         
-        frame_count = 0
         start_time = time.time()
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
+        def process(frame_index, frame, scratch):
             # Calculate current time in video
-            current_time = frame_count / fps
-            
-            # Get telemetry for this time
-            light, color_temp, motion = self.interpolate_telemetry(
-                profile.telemetry_sequence, current_time
-            )
-            
-            # Create telemetry frame
-            telemetry = self.create_telemetry_frame(light, color_temp, motion)
-            
-            # Process frame
-            if profile_name == "standard":
-                enhanced_frame, metrics = processor.process_frame(frame, None)
-            else:
-                enhanced_frame, metrics = processor.process_frame(frame, telemetry)
+            current_time = frame_index / fps
             
-            # Write frame
-            out.write(enhanced_frame)
+            enhanced_frames = []
+            for i, render in enumerate(renders):
+                # Get telemetry for this time (the frame count is only an estimate)
+                if frame_index < len(render.readings):
+                    light, color_temp, motion = render.readings[frame_index]
+                else:
+                    light, color_temp, motion = self.interpolate_telemetry(render.profile, current_time)
+                
+                # The first render uses the pipeline's buffer, the others their own ring
+                if i == 0:
+                    out = scratch
+                else:
+                    if not render.outputs:
+                        render.outputs = [np.empty_like(frame) for _ in range(_QUEUE_SIZE + 2)]
+                    out = render.outputs[frame_index % len(render.outputs)]
+                
+                # Process frame; process_frame_raw re-resolves its parameters
+                # whenever the readings change, so each frame gets its own reading
+                if render.name == "standard":
+                    enhanced_frame, metrics = render.processor.process_frame(frame, None, out=out)
+                else:
+                    enhanced_frame, metrics = render.processor.process_frame_raw(
+                        frame, light, color_temp, motion, out=out
+                    )
+                enhanced_frames.append(enhanced_frame)
+                
+                # Progress update
+                done = frame_index + 1
+                if done % 30 == 0:
+                    progress = (done / total_frames) * 100
+                    print(f"[{render.name}] Progress: {progress:.1f}% | "
+                          f"Light: {light:.0f} lux | "
+                          f"Color: {color_temp:.0f}K | "
+                          f"Motion: {motion*100:.0f}% | "
+                          f"Latency: {metrics['process_time_ms']:.1f}ms", flush=True)
             
-            frame_count += 1
-            
-            # Progress update
-            if frame_count % 30 == 0:
-                progress = (frame_count / total_frames) * 100
-                print(f"Progress: {progress:.1f}% | "
-                      f"Light: {light:.0f} lux | "
-                      f"Color: {color_temp:.0f}K | "
-                      f"Motion: {motion*100:.0f}% | "
-                      f"Latency: {metrics['process_time_ms']:.1f}ms")
+            return enhanced_frames
         
-        # Cleanup
-        cap.release()
-        out.release()
+        # Decode once, process every profile and encode on separate threads
+        out = _FanOutWriter([render.writer for render in renders])
+        try:
+            frame_count = await asyncio.to_thread(run_pipeline, cap, out, process, _QUEUE_SIZE)
+        finally:
+            # Cleanup, also when the pipeline re-raises a writer error
+            cap.release()
+            out.release()
         
         # Summary
         elapsed = time.time() - start_time
         avg_fps = frame_count / elapsed
-        print(f"\n✅ {profile.name} complete!")
-        print(f"   Processed {frame_count} frames in {elapsed:.1f}s ({avg_fps:.1f} FPS)")
-        print(f"   Output: {output_path}")
+        for render in renders:
+            print(f"\n✅ {render.profile.name} complete!")
+            print(f"   Processed {frame_count} frames in {elapsed:.1f}s ({avg_fps:.1f} FPS)")
+            print(f"   Output: {render.output_path}")
     
-    async def create_all_demos(self):
+    def create_all_demos(self):
         """Create all whale demo videos"""
         print("\n" + "="*60)
         print("GPL WHALE DEMO VIDEO CREATOR")
@@ -224,9 +290,24 @@ class WhaleVideoCreator:
             print("Please run extract_whale_segment.sh first")
             return
         
-        # Process each profile
-        for profile_name in ["standard", "depth", "underwater_color", "whale_motion"]:
-            await self.process_video(profile_name)
+        # Profiles split across worker processes, each group rendered from one
+        # decode. A worker per _CORES_PER_CHAIN cores, so groups hold several
+        # profiles and share a decode until there are cores enough to give
+        # every profile its own chain. Workers share the cores, so each gets
+        # its slice of threads. Count the CPUs this process may run on (as
+        # run_pipeline does), not the machine's, in a taskset/cgroup-limited run
+        if hasattr(os, "sched_getaffinity"):
+            cpus = len(os.sched_getaffinity(0))
+        else:
+            cpus = os.cpu_count() or 1
+        workers = max(1, min(len(_DEMO_PROFILES), cpus // _CORES_PER_CHAIN))
+        groups = [_DEMO_PROFILES[i::workers] for i in range(workers)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(max(1, cpus // workers),)) as executor:
+                list(executor.map(_run_profiles, groups))
+        else:
+            _run_profiles(groups[0])
         
         print("\n" + "="*60)
         print("✅ ALL WHALE DEMOS COMPLETE!")
@@ -239,10 +320,21 @@ class WhaleVideoCreator:
         print("="*60 + "\n")
 
 
-async def main():
+def _init_worker(threads: int):
+    """Process pool initializer: cap OpenCV and Numba threads to this worker's share"""
+    cv2.setNumThreads(threads)
+    set_num_threads(threads)
+
+
+def _run_profiles(profile_names: List[str]):
+    """Process pool entry point: render a group of profiles from one decode"""
+    asyncio.run(WhaleVideoCreator().process_videos(profile_names))
+
+
+def main():
     creator = WhaleVideoCreator()
-    await creator.create_all_demos()
+    creator.create_all_demos()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -11,10 +11,10 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from core.processors.hdr_processor import HDRProcessor
-from telemetry.base import TelemetryFrame, TelemetryData, TelemetryType
 import cv2
 import numpy as np
-from datetime import datetime, timedelta
+import time
+from typing import Tuple
 
 
 class DemoRunner:
@@ -23,49 +23,38 @@ class DemoRunner:
     def __init__(self):
         self.hdr_processor = HDRProcessor(preset="balanced")
         self.telemetry_profiles = self._load_telemetry_profiles()
+        self._comparison_buf = None
         
     def _load_telemetry_profiles(self) -> dict:
         """Load telemetry profiles"""
         profile_path = Path("data/samples/telemetry_profiles.json")
         if profile_path.exists():
             with open(profile_path) as f:
-                return json.load(f)
+                profiles = json.load(f)
+            
+            # Pack each sequence into (time, ambient_light, color_temperature, motion)
+            # rows once, rather than walking the dicts for every frame
+            for profile in profiles.get("profiles", {}).values():
+                profile["sequence_array"] = np.array([
+                    [point["time"],
+                     point.get("ambient_light", 500),
+                     point.get("color_temperature", 5000),
+                     point.get("motion", 0.3)]
+                    for point in profile.get("telemetry_sequence", [])
+                ], dtype=np.float32).reshape(-1, 4)
+            return profiles
         return {}
     
-    def create_telemetry_frame(self, profile_data: dict, elapsed_seconds: float) -> TelemetryFrame:
-        """Create telemetry frame from profile data"""
-        frame = TelemetryFrame()
-        
-        # Find the right telemetry point based on time
-        sequence = profile_data.get("telemetry_sequence", [])
-        current_data = sequence[0] if sequence else {}
-        
-        for point in sequence:
-            if point["time"] <= elapsed_seconds:
-                current_data = point
-            else:
-                break
-        
-        # Add telemetry readings
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.AMBIENT_LIGHT,
-            value=current_data.get("ambient_light", 500),
-            unit="lux"
-        ))
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.COLOR_TEMPERATURE,
-            value=current_data.get("color_temperature", 5000),
-            unit="kelvin"
-        ))
-        
-        frame.add_reading(TelemetryData(
-            type=TelemetryType.MOTION,
-            value=current_data.get("motion", 0.3),
-            unit="normalized"
-        ))
-        
-        return frame
+    def telemetry_values(self, profile_data: dict, elapsed_seconds: float) -> Tuple[float, float, float]:
+        """Get (light, color_temp, motion) from profile data for this time"""
+        # Find the last telemetry point at or before this time (the first one before it starts)
+        sequence = profile_data["sequence_array"]
+        if len(sequence):
+            i = max(int(np.searchsorted(sequence[:, 0], elapsed_seconds, side="right")) - 1, 0)
+            _, light, color_temp, motion = (float(v) for v in sequence[i])
+        else:
+            light, color_temp, motion = 500.0, 5000.0, 0.3
+        return light, color_temp, motion
     
     async def run_comparison_demo(self, video_name: str):
         """Run side-by-side comparison demo"""
@@ -97,7 +86,7 @@ class DemoRunner:
         # Create output window
         cv2.namedWindow("GPL Demo - Press 'q' to skip", cv2.WINDOW_NORMAL)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         frame_count = 0
         
         while cap.isOpened():
@@ -106,26 +95,27 @@ class DemoRunner:
                 break
                 
             # Calculate elapsed time
-            elapsed = (datetime.now() - start_time).total_seconds()
+            elapsed = time.perf_counter() - start_time
             
             # Get telemetry for this moment
-            telemetry = self.create_telemetry_frame(profile, elapsed)
+            light, color_temp, motion = self.telemetry_values(profile, elapsed)
             
             # Process frame
-            enhanced, metrics = self.hdr_processor.process_frame(frame, telemetry)
+            enhanced, metrics = self.hdr_processor.process_frame_raw(frame, light, color_temp, motion)
             
-            # Create comparison view
+            # Create comparison view (buffer and divider only on the first frame of a size)
             h, w = frame.shape[:2]
-            comparison = np.zeros((h, w*2 + 20, 3), dtype=np.uint8)
+            comparison = self._comparison_buf
+            if comparison is None or comparison.shape != (h, w*2 + 20, 3):
+                comparison = np.empty((h, w*2 + 20, 3), dtype=np.uint8)
+                comparison[:, w:w+20] = 80
+                self._comparison_buf = comparison
             
             # Original SDR
-            comparison[:, :w] = frame
-            
-            # Divider
-            comparison[:, w:w+20] = 80
+            np.copyto(comparison[:, :w], frame)
             
             # Enhanced
-            comparison[:, w+20:] = enhanced
+            np.copyto(comparison[:, w+20:], enhanced)
             
             # Add labels
             cv2.putText(comparison, "Original SDR", (20, 40), 
@@ -135,9 +125,9 @@ class DemoRunner:
             
             # Add telemetry info
             telemetry_text = [
-                f"Light: {telemetry.get_value(TelemetryType.AMBIENT_LIGHT):.0f} lux",
-                f"Temp: {telemetry.get_value(TelemetryType.COLOR_TEMPERATURE):.0f}K",
-                f"Motion: {telemetry.get_value(TelemetryType.MOTION):.1f}",
+                f"Light: {light:.0f} lux",
+                f"Temp: {color_temp:.0f}K",
+                f"Motion: {motion:.1f}",
                 f"Latency: {metrics['process_time_ms']:.1f}ms"
             ]
             
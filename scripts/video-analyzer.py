@@ -8,10 +8,15 @@ import cv2
 import numpy as np
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import argparse
+import sys
+
+sys.path.insert(0, '.')
+
+from core.algorithms.frame_stats import frame_stats
+from core.utils.jit import NUMBA_AVAILABLE
 
 
 @dataclass
@@ -34,65 +39,85 @@ class VideoAnalyzer:
     
     def __init__(self):
         self.sample_frames = 30  # Sample every 30 frames
+        self.use_opencl = cv2.ocl.haveOpenCL()
         
     def analyze_video(self, video_path: str) -> VideoStats:
         """Analyze a video file"""
         print(f"Analyzing: {video_path}")
         cap = cv2.VideoCapture(video_path)
-        
-        # Get basic info
-        fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         
-        # Collect samples
-        brightness_values = []
-        saturation_values = []
-        highlights = []
-        shadows = []
+        # Collect (brightness, saturation, highlight, shadow) samples
+        samples = []
+        for frame_idx in range(0, frame_count, self.sample_frames):
+            frame = self._read_sample(cap, frame_idx)
+            if frame is None:
+                break
+            samples.append(self._frame_stats(frame))
+            
+            # Progress
+            print(f"  Progress: {frame_idx + 1}/{frame_count} frames")
+        
+        return self._build_stats(video_path, cap, samples)
+    
+    def analyze_pair(self, hdr_path: str, sdr_path: str) -> Tuple[VideoStats, VideoStats]:
+        """Analyze an HDR/SDR pair in one pass, sampling the same frame index from both"""
+        print(f"Analyzing: {hdr_path} + {sdr_path}")
+        caps = [cv2.VideoCapture(hdr_path), cv2.VideoCapture(sdr_path)]
+        frame_counts = [int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) for cap in caps]
         
-        frame_idx = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
+        samples = [[], []]
+        active = [True, True]
+        for frame_idx in range(0, max(frame_counts), self.sample_frames):
+            for i, cap in enumerate(caps):
+                if not active[i] or frame_idx >= frame_counts[i]:
+                    continue
+                frame = self._read_sample(cap, frame_idx)
+                if frame is None:
+                    active[i] = False
+                    continue
+                samples[i].append(self._frame_stats(frame))
+            if not any(active):
                 break
-                
-            if frame_idx % self.sample_frames == 0:
-                # Convert to different color spaces for analysis
-                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-                lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-                
-                # Brightness (L channel in LAB)
-                brightness = lab[:, :, 0].mean()
-                brightness_values.append(brightness)
-                
-                # Saturation (S channel in HSV)
-                saturation = hsv[:, :, 1].mean()
-                saturation_values.append(saturation)
-                
-                # Highlights and shadows
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                highlights.append(np.percentile(gray, 95))
-                shadows.append(np.percentile(gray, 5))
-                
-            frame_idx += 1
             
             # Progress
-            if frame_idx % 100 == 0:
-                print(f"  Progress: {frame_idx}/{frame_count} frames")
+            print(f"  Progress: {frame_idx + 1}/{max(frame_counts)} frames")
         
+        return (self._build_stats(hdr_path, caps[0], samples[0]),
+                self._build_stats(sdr_path, caps[1], samples[1]))
+    
+    def _read_sample(self, cap: cv2.VideoCapture, frame_idx: int) -> Optional[np.ndarray]:
+        """Seek to and decode one sampled frame, or None past the end"""
+        # Seek straight to the sample instead of decoding the frames in between
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        ret, frame = cap.read()
+        if not ret:
+            # Seeking is imprecise in some containers: take one linear step before giving up
+            ret, frame = cap.read()
+        return frame if ret else None
+    
+    def _build_stats(self, video_path: str, cap: cv2.VideoCapture,
+                     samples: List[Tuple[float, float, float, float]]) -> VideoStats:
+        """Summarize per-sample statistics and release the capture"""
+        # Get basic info
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         cap.release()
         
+        # Columns: brightness, saturation, highlights, shadows
+        brightness, saturation, highlights, shadows = np.array(samples, dtype=np.float64).reshape(-1, 4).T
+        
         # Calculate statistics
         stats = VideoStats(
             filename=Path(video_path).name,
             resolution=(width, height),
             fps=fps,
             frame_count=frame_count,
-            avg_brightness=np.mean(brightness_values),
-            brightness_range=(np.min(brightness_values), np.max(brightness_values)),
-            avg_saturation=np.mean(saturation_values),
+            avg_brightness=np.mean(brightness),
+            brightness_range=(np.min(brightness), np.max(brightness)),
+            avg_saturation=np.mean(saturation),
             dynamic_range=np.mean(highlights) - np.mean(shadows),
             peak_brightness=np.max(highlights),
             shadow_detail=np.mean(shadows)
@@ -100,6 +125,41 @@ class VideoAnalyzer:
         
         return stats
     
+    def _frame_stats(self, frame: np.ndarray) -> Tuple[float, float, float, float]:
+        """Brightness, saturation, highlight and shadow levels of one sampled frame"""
+        # Spatial means and percentiles don't need full resolution
+        if NUMBA_AVAILABLE:
+            # One compiled pass instead of two color conversions
+            small = cv2.resize(frame, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+            return frame_stats(small)
+        
+        if self.use_opencl:
+            return self._frame_stats_opencl(frame)
+        
+        small = cv2.resize(frame, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+        
+        # Rec.601 luma (the Y of YUV) serves brightness and the percentiles
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        brightness = gray.mean()
+        
+        # Saturation (S channel in HSV)
+        saturation = cv2.mean(cv2.cvtColor(small, cv2.COLOR_BGR2HSV))[1]
+        
+        # Highlights and shadows
+        return brightness, saturation, np.percentile(gray, 95), np.percentile(gray, 5)
+    
+    def _frame_stats_opencl(self, frame: np.ndarray) -> Tuple[float, float, float, float]:
+        """_frame_stats through OpenCV's transparent API (OpenCL device)"""
+        small = cv2.resize(cv2.UMat(frame), None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+        
+        # Means stay on the device; only the luma plane comes back for the percentiles
+        saturation = cv2.mean(cv2.cvtColor(small, cv2.COLOR_BGR2HSV))[1]
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        brightness = cv2.mean(gray)[0]
+        gray = gray.get()
+        
+        return brightness, saturation, np.percentile(gray, 95), np.percentile(gray, 5)
+    
     def compare_hdr_sdr(self, hdr_stats: VideoStats, sdr_stats: VideoStats) -> Dict:
         """Compare HDR and SDR versions"""
         return {
@@ -166,8 +226,7 @@ def main():
             
         # Analyze both
         print(f"\nAnalyzing pair: {base_name}")
-        hdr_stats = analyzer.analyze_video(str(hdr_file))
-        sdr_stats = analyzer.analyze_video(str(sdr_file))
+        hdr_stats, sdr_stats = analyzer.analyze_pair(str(hdr_file), str(sdr_file))
         
         # Compare
         comparison = analyzer.compare_hdr_sdr(hdr_stats, sdr_stats)
@@ -3,10 +3,12 @@ GPL Telemetry Base Classes
 Core telemetry data structures and interfaces
 """
 
+from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Coroutine, Optional, List, Sequence
 from enum import Enum
+import asyncio
 import time
 
 
@@ -18,68 +20,206 @@ class TelemetryType(Enum):
     SYSTEM_CPU = "system_cpu"
     SYSTEM_GPU = "system_gpu"
     SYSTEM_MEMORY = "system_memory"
+    
+    def __init__(self, value: str):
+        # Fixed slot per type (definition order), so frames index lists
+        # instead of hashing enum members
+        self.slot = len(type(self).__members__)
+
+
+_TELEMETRY_TYPES = tuple(TelemetryType)
+
+# Serialized key per slot, read once instead of through the enum each call
+_TELEMETRY_LABELS = tuple(t.value for t in _TELEMETRY_TYPES)
+
 
+def _isoformat(timestamp_ns: int) -> str:
+    """Local-time ISO 8601 string for a time.time_ns() timestamp"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
 
-@dataclass
+
+@dataclass(slots=True)
 class TelemetryData:
     """Single telemetry reading"""
     type: TelemetryType
     value: float
     unit: str
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: int = field(default_factory=time.time_ns)  # ns since the epoch
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
 class TelemetryFrame:
-    """Collection of telemetry data for a single time point"""
+    """
+    Collection of telemetry data for a single time point
+    
+    Readings and their values sit in fixed per-type slots (TelemetryType.slot),
+    values in their own list.
+    """
+    
+    __slots__ = ("timestamp", "readings", "values", "_dict_cache")
     
     def __init__(self):
-        self.timestamp = datetime.now()
-        self.data: Dict[TelemetryType, TelemetryData] = {}
+        self.timestamp = time.time_ns()  # ns since the epoch
+        self.readings: List[Optional[TelemetryData]] = [None] * len(_TELEMETRY_TYPES)
+        self.values: List[float] = [0.0] * len(_TELEMETRY_TYPES)
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        
+    @property
+    def data(self) -> Dict[TelemetryType, TelemetryData]:
+        """Readings present in this frame, keyed by type"""
+        return {t: r for t, r in zip(_TELEMETRY_TYPES, self.readings) if r is not None}
         
     def add_reading(self, reading: TelemetryData):
         """Add a telemetry reading to this frame"""
-        self.data[reading.type] = reading
+        slot = reading.type.slot
+        self.readings[slot] = reading
+        self.values[slot] = reading.value
+        self._dict_cache = None
         
-    def get_value(self, telemetry_type: TelemetryType, default: float = 0.0) -> float:
+    def get_value(self, telemetry_type: TelemetryType, default: Optional[float] = 0.0) -> Optional[float]:
         """Get value for a specific telemetry type"""
-        if telemetry_type in self.data:
-            return self.data[telemetry_type].value
+        slot = telemetry_type.slot
+        if self.readings[slot] is not None:
+            return self.values[slot]
         return default
         
     def get_latest_values(self) -> Dict[TelemetryType, float]:
         """Get all latest values as a simple dict"""
-        return {t: d.value for t, d in self.data.items()}
+        return {
+            t: v for t, r, v in zip(_TELEMETRY_TYPES, self.readings, self.values)
+            if r is not None
+        }
         
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "timestamp": self.timestamp.isoformat(),
-            "data": {
-                t.value: {
-                    "value": d.value,
-                    "unit": d.unit,
-                    "timestamp": d.timestamp.isoformat()
+        """
+        Convert to dictionary for JSON serialization
+        
+        The result is cached until the next add_reading, so
+        treat it as read-only.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "timestamp": _isoformat(self.timestamp),
+                "data": {
+                    label: {
+                        "value": v,
+                        "unit": r.unit,
+                        "timestamp": _isoformat(r.timestamp)
+                    }
+                    for label, r, v in zip(_TELEMETRY_LABELS, self.readings, self.values)
+                    if r is not None
                 }
-                for t, d in self.data.items()
             }
-        }
+        return self._dict_cache
+
+
+class TelemetryView:
+    """
+    Read-only view of one time point in telemetry stored as one array per type
+    
+    Offers the TelemetryFrame read API, plus attribute access by type value
+    (view.ambient_light), while the readings stay in contiguous per-type
+    arrays. Move it along the series by setting index.
+    """
+    
+    __slots__ = ("series", "index")
+    
+    def __init__(self, series: Dict[TelemetryType, Sequence[float]], index: int = 0):
+        self.series = series
+        self.index = index
+        
+    def get_value(self, telemetry_type: TelemetryType, default: Optional[float] = 0.0) -> Optional[float]:
+        """Get value for a specific telemetry type"""
+        if telemetry_type in self.series:
+            return float(self.series[telemetry_type][self.index])
+        return default
+        
+    def get_latest_values(self) -> Dict[TelemetryType, float]:
+        """Get all values at the current index as a simple dict"""
+        return {t: float(values[self.index]) for t, values in self.series.items()}
+        
+    def __getattr__(self, name: str) -> float:
+        try:
+            telemetry_type = TelemetryType(name)
+        except ValueError:
+            raise AttributeError(name) from None
+        if telemetry_type not in self.series:
+            raise AttributeError(name)
+        return float(self.series[telemetry_type][self.index])
 
 
-class TelemetrySensor:
+class _TimedCall:
+    """
+    Awaitable running a coroutine while timing only its own steps
+    
+    Time spent suspended (waiting on I/O, or running other coroutines) is
+    not counted in cost_ns.
+    """
+    
+    __slots__ = ("_coro", "cost_ns")
+    
+    def __init__(self, coro: Coroutine):
+        self._coro = coro
+        self.cost_ns = 0
+        
+    def __await__(self):
+        value, error = None, None
+        while True:
+            start = time.monotonic_ns()
+            try:
+                if error is None:
+                    yielded = self._coro.send(value)
+                else:
+                    yielded = self._coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.cost_ns += time.monotonic_ns() - start
+            value, error = None, None
+            try:
+                value = yield yielded
+            except BaseException as exc:
+                error = exc
+
+
+class TelemetrySensor(ABC):
     """Base class for telemetry sensors"""
     
+    __slots__ = ("name", "is_initialized", "_last_reading", "_last_read_ns")
+    
+    # Reuse a reading for this long, but only if taking it cost more than
+    # memoize_cost_ns; cheap reads are always taken fresh
+    min_interval_ns = 50_000_000
+    memoize_cost_ns = 200_000
+    
     def __init__(self, name: str):
         self.name = name
         self.is_initialized = False
+        self._last_reading: Optional[TelemetryData] = None
+        self._last_read_ns = 0
         
     async def initialize(self):
         """Initialize the sensor"""
         self.is_initialized = True
         
     async def read(self) -> Optional[TelemetryData]:
-        """Read current value from sensor"""
-        raise NotImplementedError
+        """Read current value from sensor, reusing a recent expensive reading"""
+        now = time.monotonic_ns()
+        if self._last_reading is not None and now - self._last_read_ns < self.min_interval_ns:
+            return self._last_reading
+        
+        call = _TimedCall(self._read_impl())
+        reading = await call
+        if reading is not None and call.cost_ns > self.memoize_cost_ns:
+            self._last_reading = reading
+            self._last_read_ns = now
+        else:
+            self._last_reading = None
+        return reading
+        
+    @abstractmethod
+    async def _read_impl(self) -> Optional[TelemetryData]:
+        """Take a reading from the sensor; subclasses implement this"""
         
     async def shutdown(self):
         """Cleanup sensor resources"""
@@ -101,32 +241,32 @@ class TelemetryCollector:
     async def start(self):
         """Start collecting telemetry"""
         self.is_running = True
-        for sensor in self.sensors:
-            await sensor.initialize()
+        await asyncio.gather(*(sensor.initialize() for sensor in self.sensors))
             
     async def stop(self):
         """Stop collecting telemetry"""
         self.is_running = False
-        for sensor in self.sensors:
-            await sensor.shutdown()
+        await asyncio.gather(*(sensor.shutdown() for sensor in self.sensors))
             
     async def collect_frame(self) -> TelemetryFrame:
         """Collect a single frame of telemetry data"""
         frame = TelemetryFrame()
         
-        for sensor in self.sensors:
-            try:
-                reading = await sensor.read()
-                if reading:
-                    frame.add_reading(reading)
-            except Exception as e:
-                print(f"Error reading from sensor {sensor.name}: {e}")
+        # Read all sensors concurrently, so one waiting on I/O doesn't hold up the rest
+        readings = await asyncio.gather(
+            *(sensor.read() for sensor in self.sensors), return_exceptions=True
+        )
+        for sensor, reading in zip(self.sensors, readings):
+            if isinstance(reading, BaseException):
+                print(f"Error reading from sensor {sensor.name}: {reading}")
+            elif reading:
+                frame.add_reading(reading)
                 
         self.current_frame = frame
         return frame
         
-    async def get_current_telemetry(self) -> Optional[TelemetryFrame]:
-        """Get the most recent telemetry frame"""
+    def get_current_telemetry(self) -> Optional[TelemetryFrame]:
+        """Get the most recent telemetry frame, as cached by the last collection"""
         if not self.is_running:
             return None
         return self.current_frame
\ No newline at end of file
@@ -46,12 +46,22 @@ class SystemTelemetryCollector(TelemetryCollector):
         
     async def _collect_continuously(self):
         """Background task to collect telemetry continuously"""
+        # Ticks are scheduled against absolute deadlines, so time spent
+        # collecting doesn't stretch the interval
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         while self.is_running:
+            deadline += self.collection_interval
             try:
                 await self.collect_frame()
-                await asyncio.sleep(self.collection_interval)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 print(f"Error in telemetry collection: {e}")
-                await asyncio.sleep(self.collection_interval)
\ No newline at end of file
+            
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Missed ticks are dropped rather than collected in a burst
+                deadline = loop.time()
\ No newline at end of file
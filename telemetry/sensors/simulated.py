@@ -4,39 +4,84 @@ Provides simulated telemetry data for demos
 """
 
 import asyncio
-import math
 import time
 import random
 from typing import Optional
 
+import numpy as np
+
 from telemetry.base import TelemetrySensor, TelemetryData, TelemetryType
 
 
+class _NoiseBuffer:
+    """Uniform noise drawn from NumPy in batches and handed out one value at a time"""
+    
+    def __init__(self, low: float, high: float, size: int = 4096):
+        self.low = low
+        self.high = high
+        self.size = size
+        self._rng = np.random.default_rng()
+        self._refill()
+        
+    def _refill(self):
+        self._values = self._rng.uniform(self.low, self.high, self.size).tolist()
+        self._index = 0
+        
+    def next(self) -> float:
+        """Return the next noise value, drawing a new batch when exhausted"""
+        if self._index == self.size:
+            self._refill()
+        value = self._values[self._index]
+        self._index += 1
+        return value
+
+
+# Waveform samples per day/night cycle (one per 100 ms collection tick at 120 s)
+_WAVEFORM_STEPS = 1200
+_CYCLE_POSITIONS = np.arange(_WAVEFORM_STEPS) / _WAVEFORM_STEPS
+
+# Simulate sunrise -> noon -> sunset -> night
+_LUX_WAVEFORM = np.select(
+    [_CYCLE_POSITIONS < 0.25, _CYCLE_POSITIONS < 0.5, _CYCLE_POSITIONS < 0.75],
+    [100 + (900 * (_CYCLE_POSITIONS * 4)),            # Dawn
+     1000 + (4000 * ((_CYCLE_POSITIONS - 0.25) * 4)),  # Morning to noon
+     5000 - (4000 * ((_CYCLE_POSITIONS - 0.5) * 4))],  # Afternoon to dusk
+    1000 - (900 * ((_CYCLE_POSITIONS - 0.75) * 4))     # Night
+).tolist()
+
+# Morning: warm -> Day: neutral -> Evening: warm
+_KELVIN_WAVEFORM = np.select(
+    [_CYCLE_POSITIONS < 0.3, _CYCLE_POSITIONS < 0.7],
+    [3000 + (2000 * (_CYCLE_POSITIONS / 0.3)),                          # Morning
+     5000 + (1000 * np.sin((_CYCLE_POSITIONS - 0.3) * 2.5 * np.pi))],  # Day
+    5000 - (2000 * ((_CYCLE_POSITIONS - 0.7) / 0.3))                   # Evening
+).tolist()
+
+
+def _waveform_index(start_time: float, cycle_duration: float) -> int:
+    """Index of the current cycle position in the waveform tables"""
+    elapsed = time.time() - start_time
+    cycle_position = (elapsed % cycle_duration) / cycle_duration
+    return min(int(cycle_position * _WAVEFORM_STEPS), _WAVEFORM_STEPS - 1)
+
+
 class SimulatedLightSensor(TelemetrySensor):
     """Simulates ambient light sensor with day/night cycles"""
     
+    __slots__ = ("start_time", "cycle_duration", "_noise")
+    
     def __init__(self):
         super().__init__("simulated_light")
         self.start_time = time.time()
         self.cycle_duration = 120  # 2 minute day/night cycle for demo
+        self._noise = _NoiseBuffer(-50, 50)
         
-    async def read(self) -> Optional[TelemetryData]:
+    async def _read_impl(self) -> Optional[TelemetryData]:
         """Simulate ambient light that cycles through day/night"""
-        elapsed = time.time() - self.start_time
-        cycle_position = (elapsed % self.cycle_duration) / self.cycle_duration
+        lux = _LUX_WAVEFORM[_waveform_index(self.start_time, self.cycle_duration)]
         
-        # Simulate sunrise -> noon -> sunset -> night
-        if cycle_position < 0.25:  # Dawn
-            lux = 100 + (900 * (cycle_position * 4))
-        elif cycle_position < 0.5:  # Morning to noon
-            lux = 1000 + (4000 * ((cycle_position - 0.25) * 4))
-        elif cycle_position < 0.75:  # Afternoon to dusk
-            lux = 5000 - (4000 * ((cycle_position - 0.5) * 4))
-        else:  # Night
-            lux = 1000 - (900 * ((cycle_position - 0.75) * 4))
-            
         # Add some noise
-        lux += random.uniform(-50, 50)
+        lux += self._noise.next()
         lux = max(50, min(5000, lux))
         
         return TelemetryData(
@@ -49,25 +94,19 @@ class SimulatedLightSensor(TelemetrySensor):
 class SimulatedColorTempSensor(TelemetrySensor):
     """Simulates color temperature sensor correlating with light"""
     
+    __slots__ = ("start_time", "cycle_duration", "_noise")
+    
     def __init__(self):
         super().__init__("simulated_color_temp")
         self.start_time = time.time()
         self.cycle_duration = 120
+        self._noise = _NoiseBuffer(-100, 100)
         
-    async def read(self) -> Optional[TelemetryData]:
+    async def _read_impl(self) -> Optional[TelemetryData]:
         """Simulate color temperature that changes with time of day"""
-        elapsed = time.time() - self.start_time
-        cycle_position = (elapsed % self.cycle_duration) / self.cycle_duration
+        kelvin = _KELVIN_WAVEFORM[_waveform_index(self.start_time, self.cycle_duration)]
         
-        # Morning: warm -> Day: neutral -> Evening: warm
-        if cycle_position < 0.3:  # Morning
-            kelvin = 3000 + (2000 * (cycle_position / 0.3))
-        elif cycle_position < 0.7:  # Day
-            kelvin = 5000 + (1000 * math.sin((cycle_position - 0.3) * 2.5 * math.pi))
-        else:  # Evening
-            kelvin = 5000 - (2000 * ((cycle_position - 0.7) / 0.3))
-            
-        kelvin += random.uniform(-100, 100)
+        kelvin += self._noise.next()
         kelvin = max(2700, min(6500, kelvin))
         
         return TelemetryData(
@@ -80,13 +119,16 @@ class SimulatedColorTempSensor(TelemetrySensor):
 class SimulatedMotionSensor(TelemetrySensor):
     """Simulates motion detection with varying activity levels"""
     
+    __slots__ = ("motion_level", "target_motion", "last_change", "_noise")
+    
     def __init__(self):
         super().__init__("simulated_motion")
         self.motion_level = 0.3
         self.target_motion = 0.3
         self.last_change = time.time()
+        self._noise = _NoiseBuffer(-0.05, 0.05)
         
-    async def read(self) -> Optional[TelemetryData]:
+    async def _read_impl(self) -> Optional[TelemetryData]:
         """Simulate motion that changes periodically"""
         current_time = time.time()
         
@@ -99,7 +141,7 @@ class SimulatedMotionSensor(TelemetrySensor):
         self.motion_level += (self.target_motion - self.motion_level) * 0.1
         
         # Add noise
-        motion = self.motion_level + random.uniform(-0.05, 0.05)
+        motion = self.motion_level + self._noise.next()
         motion = max(0.0, min(1.0, motion))
         
         return TelemetryData(
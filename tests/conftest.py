@@ -0,0 +1,9 @@
+"""
+Shared test setup
+"""
+
+import sys
+from pathlib import Path
+
+# Import the project packages the way the scripts do, from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
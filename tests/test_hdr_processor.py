@@ -0,0 +1,29 @@
+"""
+HDRProcessor tests
+"""
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from core.processors.hdr_processor import HDRProcessor
+
+SAMPLES = Path(__file__).resolve().parent.parent / "data" / "samples" / "preview"
+
+
+@pytest.mark.parametrize("preset", ["balanced", "quality"])
+@pytest.mark.parametrize("sample", ["frame_30s.jpg", "frame_50s.jpg"])
+def test_cached_lut_matches_process_frame(preset, sample):
+    frame = cv2.imread(str(SAMPLES / sample))
+    assert frame is not None
+    processor = HDRProcessor(preset=preset)
+    
+    full, _ = processor.process_frame(frame)
+    cached, _ = processor.apply_cached_lut(frame)
+    
+    # Same brightness: the skipped stages (sharpening, denoise) only move
+    # individual pixels around their neighbours
+    assert abs(float(full.mean()) - float(cached.mean())) < 2.0
+    assert np.abs(full.astype(np.int16) - cached.astype(np.int16)).mean() < 4.0
@@ -0,0 +1,54 @@
+"""
+WebDemo render cache tests
+"""
+
+from pathlib import Path
+
+import cv2
+
+from telemetry.base import TelemetryData, TelemetryFrame, TelemetryType
+from web_demo import WebDemo
+
+SAMPLES = Path(__file__).resolve().parent.parent / "data" / "samples" / "preview"
+
+
+def _telemetry(light: float, color_temp: float, motion: float) -> TelemetryFrame:
+    frame = TelemetryFrame()
+    frame.add_reading(TelemetryData(TelemetryType.AMBIENT_LIGHT, light, "lux"))
+    frame.add_reading(TelemetryData(TelemetryType.COLOR_TEMPERATURE, color_temp, "K"))
+    frame.add_reading(TelemetryData(TelemetryType.MOTION, motion, "level"))
+    return frame
+
+
+def _sample_frame():
+    return cv2.resize(cv2.imread(str(SAMPLES / "frame_30s.jpg")), (320, 180))
+
+
+def test_render_cache_hit_matches_fresh_render():
+    frame = _sample_frame()
+    demo = WebDemo()
+    first, _ = demo._render(frame, 0, _telemetry(812.0, 5480.0, 0.31))
+    
+    # Readings within one step resolve to the same parameters: a hit
+    cached, _ = demo._render(frame, 0, _telemetry(798.0, 5520.0, 0.29))
+    assert cached is first
+    assert len(demo._render_cache) == 1
+    
+    # ... and the cached frame is exactly what a fresh render produces
+    fresh, _ = WebDemo()._render(frame, 0, _telemetry(798.0, 5520.0, 0.29))
+    assert fresh == cached
+
+
+def test_render_cache_miss_on_new_parameters_or_frame():
+    frame = _sample_frame()
+    demo = WebDemo()
+    first, _ = demo._render(frame, 0, _telemetry(800.0, 5500.0, 0.3))
+    
+    # Darker scene: new exposure, so a new render
+    darker, _ = demo._render(frame, 0, _telemetry(100.0, 5500.0, 0.3))
+    assert darker != first
+    assert len(demo._render_cache) == 2
+    
+    # Same parameters at another point in the loop
+    demo._render(frame, 1, _telemetry(800.0, 5500.0, 0.3))
+    assert len(demo._render_cache) == 3
@@ -3,19 +3,33 @@ GPL API Routes
 REST API endpoints for the web interface
 """
 
+import asyncio
+from dataclasses import dataclass, field
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
-api_router = APIRouter()
+# orjson for every route; the plain-dict routes also return ORJSONResponse
+# themselves, which skips FastAPI's jsonable_encoder pass
+api_router = APIRouter(default_response_class=ORJSONResponse)
+
+
+@dataclass
+class ProcessingState:
+    """Processing status shared by the routes and the frame loop"""
+    running: asyncio.Event = field(default_factory=asyncio.Event)
+    current_source: Optional[str] = None
+    frames_processed: int = 0
+    telemetry: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def is_processing(self) -> bool:
+        return self.running.is_set()
+
 
 # Global state (in production, use proper state management)
-processing_state = {
-    "is_processing": False,
-    "current_source": None,
-    "frames_processed": 0,
-    "telemetry": {}
-}
+processing_state = ProcessingState()
 
 
 class ProcessingRequest(BaseModel):
@@ -28,13 +42,14 @@ class ProcessingResponse(BaseModel):
     
 
 @api_router.get("/status")
-async def get_status() -> Dict[str, Any]:
+async def get_status() -> ORJSONResponse:
     """Get current processing status"""
-    return {
-        "is_processing": processing_state["is_processing"],
-        "current_source": processing_state["current_source"],
-        "frames_processed": processing_state["frames_processed"]
-    }
+    state = processing_state
+    return ORJSONResponse({
+        "is_processing": state.is_processing,
+        "current_source": state.current_source,
+        "frames_processed": state.frames_processed
+    })
 
 
 @api_router.post("/process/start")
@@ -43,12 +58,12 @@ async def start_processing(
     background_tasks: BackgroundTasks
 ) -> ProcessingResponse:
     """Start video processing"""
-    if processing_state["is_processing"]:
+    if processing_state.is_processing:
         raise HTTPException(status_code=400, detail="Processing already in progress")
     
-    processing_state["is_processing"] = True
-    processing_state["current_source"] = request.source
-    processing_state["frames_processed"] = 0
+    processing_state.running.set()
+    processing_state.current_source = request.source
+    processing_state.frames_processed = 0
     
     # Note: In the actual implementation, this would trigger the processing
     # For now, we'll just update the state
@@ -62,11 +77,11 @@ async def start_processing(
 @api_router.post("/process/stop")
 async def stop_processing() -> ProcessingResponse:
     """Stop video processing"""
-    if not processing_state["is_processing"]:
+    if not processing_state.is_processing:
         raise HTTPException(status_code=400, detail="No processing in progress")
     
-    processing_state["is_processing"] = False
-    processing_state["current_source"] = None
+    processing_state.running.clear()
+    processing_state.current_source = None
     
     return ProcessingResponse(
         status="stopped",
@@ -75,12 +90,12 @@ async def stop_processing() -> ProcessingResponse:
 
 
 @api_router.get("/telemetry/current")
-async def get_current_telemetry() -> Dict[str, Any]:
+async def get_current_telemetry() -> ORJSONResponse:
     """Get current telemetry data"""
-    return processing_state.get("telemetry", {})
+    return ORJSONResponse(processing_state.telemetry)
 
 
 @api_router.get("/health")
-async def health_check() -> Dict[str, str]:
+async def health_check() -> ORJSONResponse:
     """Health check endpoint"""
-    return {"status": "healthy", "service": "gpl"}
\ No newline at end of file
+    return ORJSONResponse({"status": "healthy", "service": "gpl"})
\ No newline at end of file
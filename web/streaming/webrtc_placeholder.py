@@ -7,7 +7,16 @@ import asyncio
 import numpy as np
 from typing import Optional
 import base64
-import cv2
+
+from core.utils.jpeg import encode_jpeg
+
+try:
+    # SIMD base64 (AVX2/SSSE3/NEON); returns str without a separate decode
+    from pybase64 import b64encode_as_string
+except ImportError:
+    def b64encode_as_string(data) -> str:
+        """Stdlib stand-in for pybase64.b64encode_as_string"""
+        return base64.b64encode(data).decode('ascii')
 
 
 class WebRTCServer:
@@ -18,6 +27,12 @@ class WebRTCServer:
         self.current_frame = None
         self.frame_subscribers = []
         
+        # Last encoded frame, so polls between new frames don't re-encode
+        self._cached_jpeg: Optional[bytes] = None
+        self._cached_b64: Optional[str] = None
+        # The frame itself, not its id(): a freed frame's address gets reused
+        self._cached_frame: Optional[np.ndarray] = None
+        
     async def start(self):
         """Start the streaming server"""
         self.is_streaming = True
@@ -27,25 +42,58 @@ class WebRTCServer:
         self.is_streaming = False
         
     async def send_frame(self, frame: np.ndarray):
-        """Send a frame to all subscribers"""
+        """Send a frame to all subscribers, as raw JPEG bytes for binary WebSocket frames"""
         self.current_frame = frame
+        # A new send is a new image even when the caller reuses its buffer
+        self._cached_frame = None
         
-        # For demo: convert frame to base64 for web display
+        # Nobody to push to; an HTTP poll encodes the frame if it asks for it
+        if not self.frame_subscribers:
+            return
+        
+        # For demo: JPEG for web display (a Blob on the client, no base64)
         # In production, use proper WebRTC or HLS streaming
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        
-        # Notify subscribers (WebSocket connections would go here)
-        for subscriber in self.frame_subscribers:
-            try:
-                await subscriber(frame_base64)
-            except Exception as e:
-                print(f"Error sending frame to subscriber: {e}")
+        # The encode runs on a worker thread (both encoders release the GIL),
+        # so other requests keep being served meanwhile
+        jpeg_bytes = await asyncio.to_thread(self._encode_jpeg, frame)
+        self._remember(frame, jpeg_bytes)
+        
+        # Notify subscribers concurrently (WebSocket connections would go here)
+        results = await asyncio.gather(
+            *(subscriber(jpeg_bytes) for subscriber in self.frame_subscribers),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error sending frame to subscriber: {result}")
                 
     def get_current_frame_base64(self) -> Optional[str]:
-        """Get current frame as base64 for HTTP polling (demo only)"""
+        """
+        Get current frame as base64 for HTTP polling (demo only)
+        
+        Deprecated: subscribers get raw JPEG bytes from send_frame, which
+        are a third smaller on the wire and skip the base64 round trip.
+        """
         if self.current_frame is None:
             return None
             
-        _, buffer = cv2.imencode('.jpg', self.current_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        return base64.b64encode(buffer).decode('utf-8')
\ No newline at end of file
+        if self._cached_frame is not self.current_frame:
+            self._encode(self.current_frame)
+        if self._cached_b64 is None:
+            self._cached_b64 = b64encode_as_string(self._cached_jpeg)
+        return self._cached_b64
+    
+    def _encode(self, frame: np.ndarray) -> bytes:
+        """JPEG-encode a frame and remember it as the cached frame"""
+        return self._remember(frame, self._encode_jpeg(frame))
+    
+    def _remember(self, frame: np.ndarray, jpeg_bytes: bytes) -> bytes:
+        """Make jpeg_bytes the cached encoding of frame"""
+        self._cached_jpeg = jpeg_bytes
+        self._cached_b64 = None
+        self._cached_frame = frame
+        return jpeg_bytes
+    
+    def _encode_jpeg(self, frame: np.ndarray) -> bytes:
+        """JPEG-encode a BGR frame (libjpeg-turbo when installed)"""
+        return encode_jpeg(frame, quality=80)
@@ -4,220 +4,66 @@ Real-time HDR enhancement with telemetry visualization
 """
 
 import asyncio
+from collections import OrderedDict
+import contextlib
+import dataclasses
 import cv2
 import numpy as np
-import base64
-import json
+import math
+import orjson
 import time
 from pathlib import Path
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
-from typing import Optional
+from typing import Any, Dict, Optional, Set, Tuple
 import sys
+import threading
 
 sys.path.insert(0, '.')
 
 from config.settings import settings
 from core.processors.hdr_processor import HDRProcessor
+from core.utils.jpeg import encode_jpeg
+from core.utils.video import open_capture, read_into
+from telemetry.base import TelemetryFrame, TelemetryType
 from telemetry.collectors.system_telemetry import SystemTelemetryCollector
 
+# libuv event loop where available (uvloop has no Windows support)
+EVENT_LOOP = "uvloop" if sys.platform != "win32" else "asyncio"
 
-class WebDemo:
-    def __init__(self):
-        self.app = FastAPI(title="GPL Web Demo")
-        self.hdr_processor = HDRProcessor(preset="balanced")
-        self.telemetry_collector = SystemTelemetryCollector(use_simulated=True)
-        self.is_processing = False
-        self.websocket_clients = []
-        
-        # Setup routes
-        self.setup_routes()
-        
-    def setup_routes(self):
-        @self.app.get("/")
-        async def index():
-            return HTMLResponse(self.get_index_html())
-            
-        @self.app.websocket("/ws")
-        async def websocket_endpoint(websocket: WebSocket):
-            await websocket.accept()
-            self.websocket_clients.append(websocket)
-            
-            try:
-                while True:
-                    # Keep connection alive
-                    await websocket.receive_text()
-            except WebSocketDisconnect:
-                self.websocket_clients.remove(websocket)
-                
-        @self.app.post("/start")
-        async def start_processing():
-            if not self.is_processing:
-                asyncio.create_task(self.process_video())
-            return {"status": "started"}
-            
-        @self.app.post("/stop")
-        async def stop_processing():
-            self.is_processing = False
-            return {"status": "stopped"}
-            
-        @self.app.get("/demo-video")
-        async def get_demo_video():
-            video_path = await self.create_demo_video()
-            return FileResponse(video_path)
-    
-    async def create_demo_video(self):
-        """Create or return demo video"""
-        demo_path = Path("data/samples/demo_video.mp4")
-        demo_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        if not demo_path.exists():
-            # Create a test pattern video
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(str(demo_path), fourcc, 30.0, (1280, 720))
-            
-            for frame_num in range(150):  # 5 seconds
-                frame = np.zeros((720, 1280, 3), dtype=np.uint8)
-                
-                # Create test pattern
-                for y in range(720):
-                    for x in range(1280):
-                        # Create zones with different characteristics
-                        if x < 320:  # Dark zone
-                            base = 30
-                        elif x < 640:  # Mid zone
-                            base = 128
-                        elif x < 960:  # Bright zone
-                            base = 200
-                        else:  # Color gradient zone
-                            base = 128
-                            
-                        if x >= 960:
-                            frame[y, x] = [
-                                int(base + 50 * np.sin(frame_num * 0.1)),
-                                int(base + 50 * np.cos(frame_num * 0.1)),
-                                base
-                            ]
-                        else:
-                            gray = base + int(20 * np.sin(y * 0.02))
-                            frame[y, x] = [gray, gray, gray]
-                
-                # Add moving elements
-                circle_x = int(640 + 300 * np.sin(frame_num * 0.05))
-                circle_y = int(360 + 200 * np.cos(frame_num * 0.05))
-                cv2.circle(frame, (circle_x, circle_y), 50, (255, 128, 0), -1)
-                
-                # Add text
-                cv2.putText(frame, f"GPL Test Pattern - Frame {frame_num}", 
-                           (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                
-                out.write(frame)
-            
-            out.release()
-            
-        return str(demo_path)
-    
-    async def process_video(self):
-        """Process video and stream results to browser"""
-        self.is_processing = True
-        
-        # Start telemetry
-        await self.telemetry_collector.start()
-        
-        # Get video
-        video_path = await self.create_demo_video()
-        cap = cv2.VideoCapture(video_path)
-        
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_delay = 1.0 / fps
-        
-        try:
-            while self.is_processing and cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    # Loop video
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    continue
-                
-                # Get telemetry
-                telemetry = await self.telemetry_collector.get_current_telemetry()
-                
-                # Process frame
-                enhanced_frame, metrics = self.hdr_processor.process_frame(frame, telemetry)
-                
-                # Create side-by-side comparison
-                comparison = np.hstack([frame, enhanced_frame])
-                
-                # Add labels
-                h, w = frame.shape[:2]
-                label_bg = np.zeros((60, w*2, 3), dtype=np.uint8)
-                cv2.putText(label_bg, "Original SDR", (20, 40),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
-                cv2.putText(label_bg, "GPL Enhanced", (w + 20, 40),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
-                
-                # Stack labels on top
-                display_frame = np.vstack([label_bg, comparison])
-                
-                # Resize for web display
-                display_frame = cv2.resize(display_frame, (1280, 420))
-                
-                # Convert to base64
-                _, buffer = cv2.imencode('.jpg', display_frame, 
-                                        [cv2.IMWRITE_JPEG_QUALITY, 85])
-                frame_base64 = base64.b64encode(buffer).decode('utf-8')
-                
-                # Prepare telemetry data
-                telemetry_data = {
-                    "ambient_light": 0,
-                    "color_temp": 0,
-                    "motion": 0,
-                    "latency": metrics['process_time_ms'],
-                    "exposure": metrics['params']['exposure'],
-                    "contrast": metrics['params']['contrast'],
-                    "saturation": metrics['params']['saturation']
-                }
-                
-                if telemetry and telemetry.data:
-                    telemetry_values = telemetry.get_latest_values()
-                    for t_type, value in telemetry_values.items():
-                        if t_type.value == "ambient_light":
-                            telemetry_data["ambient_light"] = value
-                        elif t_type.value == "color_temperature":
-                            telemetry_data["color_temp"] = value
-                        elif t_type.value == "motion":
-                            telemetry_data["motion"] = value
-                
-                # Send to all connected clients
-                message = json.dumps({
-                    "type": "frame",
-                    "data": frame_base64,
-                    "telemetry": telemetry_data
-                })
-                
-                disconnected = []
-                for client in self.websocket_clients:
-                    try:
-                        await client.send_text(message)
-                    except:
-                        disconnected.append(client)
-                
-                # Remove disconnected clients
-                for client in disconnected:
-                    self.websocket_clients.remove(client)
-                
-                # Control frame rate
-                await asyncio.sleep(frame_delay)
-                
-        finally:
-            cap.release()
-            await self.telemetry_collector.stop()
-            self.is_processing = False
-    
-    def get_index_html(self):
-        return """
+# Most frames a lagging client gets coalesced into one WebSocket message;
+# older frames are dropped beyond that
+_MAX_FRAME_BATCH = 3
+
+# Seconds one send may take before the client is taken to be hung and
+# disconnected. Slow clients are already handled by dropping queued frames,
+# so this only has to catch a send that never completes
+_SEND_TIMEOUT = 5.0
+
+# Rendered frames kept for reuse: one pass of the 150-frame demo loop
+_RENDER_CACHE_SIZE = 150
+
+# Steps readings are snapped to before they are applied. Nearby readings
+# then resolve to the same parameters, so their renders are the same frame
+# and can share a render cache entry
+_READING_STEPS = {
+    TelemetryType.AMBIENT_LIGHT: 50.0,
+    TelemetryType.COLOR_TEMPERATURE: 100.0,
+    TelemetryType.MOTION: 0.1,
+}
+
+# Readings sent to the page, by the key its telemetry panel reads
+_TELEMETRY_KEY_MAP = {
+    TelemetryType.AMBIENT_LIGHT: "ambient_light",
+    TelemetryType.COLOR_TEMPERATURE: "color_temp",
+    TelemetryType.MOTION: "motion",
+}
+
+
+# Index page, encoded once at import
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -511,16 +357,30 @@ class WebDemo:
     <script>
         let ws = null;
         let isProcessing = false;
+        let frameUrl = null;
+        const textDecoder = new TextDecoder();
         
         function connectWebSocket() {
             ws = new WebSocket('ws://localhost:8000/ws');
+            ws.binaryType = 'arraybuffer';
             
             ws.onopen = () => {
                 console.log('WebSocket connected');
             };
             
             ws.onmessage = (event) => {
-                const data = JSON.parse(event.data);
+                // One or more [4-byte length][frame message] entries; show the newest
+                const view = new DataView(event.data);
+                let offset = 0, start = 0, length = 0;
+                while (offset < event.data.byteLength) {
+                    length = view.getUint32(offset, true);
+                    start = offset + 4;
+                    offset = start + length;
+                }
+                
+                // Frame message: [4-byte little-endian header length][JSON header][JPEG bytes]
+                const headerLength = view.getUint32(start, true);
+                const data = JSON.parse(textDecoder.decode(new Uint8Array(event.data, start + 4, headerLength)));
                 
                 if (data.type === 'frame') {
                     // Update video display
@@ -529,7 +389,11 @@ class WebDemo:
                         document.getElementById('video-display').innerHTML = 
                             '<img id="video-img" style="width: 100%; height: auto;">';
                     }
-                    document.getElementById('video-img').src = 'data:image/jpeg;base64,' + data.data;
+                    const jpegStart = start + 4 + headerLength;
+                    const jpeg = new Blob([new Uint8Array(event.data, jpegStart, start + length - jpegStart)], {type: 'image/jpeg'});
+                    if (frameUrl) URL.revokeObjectURL(frameUrl);
+                    frameUrl = URL.createObjectURL(jpeg);
+                    document.getElementById('video-img').src = frameUrl;
                     
                     // Update telemetry
                     updateTelemetry(data.telemetry);
@@ -610,15 +474,327 @@ class WebDemo:
     </script>
 </body>
 </html>
+""".encode("utf-8")
+
+
+class WebDemo:
+    def __init__(self):
+        self.app = FastAPI(title="GPL Web Demo")
+        self.hdr_processor = HDRProcessor(preset="balanced")
+        self.telemetry_collector = SystemTelemetryCollector(use_simulated=True)
+        self.is_processing = False
+        self._proc_task: Optional[asyncio.Task] = None
+        # Held by /start and /stop, so a start never sees a stopping task as running
+        self._control_lock = asyncio.Lock()
+        self._client_queues: Set[asyncio.Queue] = set()
+        
+        # (frame index, applied parameters) -> jpeg, oldest first; used under _render_lock
+        self._render_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        
+        # Frame composition buffers, reused across frames. Cancelling the frame
+        # loop doesn't stop a render already on a worker thread, so renders
+        # take this lock before touching them (or the processor's buffers)
+        self._render_lock = threading.Lock()
+        self._composite_buf: Optional[np.ndarray] = None
+        self._display_buf = np.empty((315, 960, 3), dtype=np.uint8)
+        
+        # Generated demo video path, once created
+        self._demo_path: Optional[str] = None
+        self._demo_lock = asyncio.Lock()
+        
+        # Setup routes
+        self.setup_routes()
+        
+    def setup_routes(self):
+        @self.app.get("/")
+        async def index():
+            return HTMLResponse(content=_INDEX_HTML, headers={"Cache-Control": "max-age=3600"})
+            
+        @self.app.websocket("/ws")
+        async def websocket_endpoint(websocket: WebSocket):
+            await websocket.accept()
+            
+            # The frame loop only enqueues; this client's sender drains its own queue
+            queue: asyncio.Queue = asyncio.Queue(maxsize=_MAX_FRAME_BATCH)
+            self._client_queues.add(queue)
+            sender = asyncio.create_task(self._send_frames(websocket, queue))
+            
+            try:
+                while True:
+                    # Keep connection alive
+                    await websocket.receive_text()
+            except (WebSocketDisconnect, RuntimeError):
+                # RuntimeError: the sender already closed the socket
+                pass
+            finally:
+                self._client_queues.discard(queue)
+                sender.cancel()
+                
+        @self.app.post("/start")
+        async def start_processing():
+            async with self._control_lock:
+                if self._proc_task is None or self._proc_task.done():
+                    self._proc_task = asyncio.create_task(self.process_video())
+            return {"status": "started"}
+            
+        @self.app.post("/stop")
+        async def stop_processing():
+            # Cancel rather than wait for the loop to notice, so a frame in flight doesn't delay the stop
+            async with self._control_lock:
+                self.is_processing = False
+                if self._proc_task is not None:
+                    self._proc_task.cancel()
+                    # Let its cleanup (capture, telemetry) finish before a /start can run
+                    await asyncio.wait({self._proc_task})
+            return {"status": "stopped"}
+            
+        @self.app.get("/demo-video")
+        async def get_demo_video():
+            video_path = await self.create_demo_video()
+            return FileResponse(video_path)
+    
+    async def create_demo_video(self):
+        """Create or return demo video, generating it at most once"""
+        if self._demo_path:
+            return self._demo_path
+        
+        # One generator at a time, so /start and /demo-video can't both write the file
+        async with self._demo_lock:
+            if self._demo_path is None:
+                demo_path = Path("data/samples/demo_video.mp4")
+                demo_path.parent.mkdir(parents=True, exist_ok=True)
+                if not demo_path.exists():
+                    # Render on a worker thread so the server keeps answering meanwhile
+                    await asyncio.to_thread(self._render_demo_video, demo_path)
+                self._demo_path = str(demo_path)
+        
+        return self._demo_path
+    
+    def _render_demo_video(self, demo_path: Path):
+        """Write the test pattern video to demo_path"""
+        # Create a test pattern video
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(str(demo_path), fourcc, 30.0, (1280, 720))
+        
+        # The gray zones don't change between frames, so build them once:
+        # a per-zone base level plus a vertical ripple
+        ripple = (20 * np.sin(np.arange(720) * 0.02)).astype(np.int16)[:, np.newaxis]
+        pattern = np.empty((720, 1280, 3), dtype=np.uint8)
+        for x0, x1, base in ((0, 320, 30), (320, 640, 128), (640, 960, 200)):  # Dark, mid, bright
+            pattern[:, x0:x1] = np.clip(base + ripple, 0, 255).astype(np.uint8)[..., np.newaxis]
+        
+        for frame_num in range(150):  # 5 seconds
+            frame = pattern.copy()
+            
+            # Color gradient zone, one color across the zone per frame
+            base = 128
+            frame[:, 960:] = [
+                int(base + 50 * math.sin(frame_num * 0.1)),
+                int(base + 50 * math.cos(frame_num * 0.1)),
+                base
+            ]
+            
+            # Add moving elements
+            circle_x = int(640 + 300 * math.sin(frame_num * 0.05))
+            circle_y = int(360 + 200 * math.cos(frame_num * 0.05))
+            cv2.circle(frame, (circle_x, circle_y), 50, (255, 128, 0), -1)
+            
+            # Add text
+            cv2.putText(frame, f"GPL Test Pattern - Frame {frame_num}", 
+                       (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            
+            out.write(frame)
+        
+        out.release()
+    
+    async def process_video(self):
+        """Process video and stream results to browser"""
+        self.is_processing = True
+        
+        # Start telemetry
+        await self.telemetry_collector.start()
+        
+        # Get video
+        video_path = await self.create_demo_video()
+        cap = open_capture(video_path)
+        
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_delay = 1.0 / fps
+        
+        # Decode into the same buffer every frame; each one is fully rendered
+        # before the next read
+        frame_buf = None
+        frame_index = 0
+        
+        try:
+            while self.is_processing and cap.isOpened():
+                ret, frame = read_into(cap, frame_buf)
+                if not ret:
+                    # Loop video: reopening decodes from the start, cheaper than seeking back
+                    cap.release()
+                    cap = open_capture(video_path)
+                    frame_index = 0
+                    continue
+                frame_buf = frame
+                
+                # Get telemetry
+                telemetry = self.telemetry_collector.get_current_telemetry()
+                
+                # Enhance, compose and encode on a worker thread, keeping the loop free
+                jpeg, metrics = await asyncio.to_thread(self._render, frame, frame_index, telemetry)
+                frame_index += 1
+                
+                # Prepare telemetry data
+                telemetry_data = {
+                    "ambient_light": 0,
+                    "color_temp": 0,
+                    "motion": 0,
+                    "latency": metrics['process_time_ms'],
+                    "exposure": metrics['params']['exposure'],
+                    "contrast": metrics['params']['contrast'],
+                    "saturation": metrics['params']['saturation']
+                }
+                
+                if telemetry:
+                    for t_type, key in _TELEMETRY_KEY_MAP.items():
+                        telemetry_data[key] = telemetry.get_value(t_type, 0)
+                
+                # Send to all connected clients as one binary message:
+                # [4-byte little-endian header length][JSON header][JPEG bytes]
+                header = orjson.dumps({
+                    "type": "frame",
+                    "telemetry": telemetry_data
+                }, option=orjson.OPT_SERIALIZE_NUMPY)
+                message = b"".join((len(header).to_bytes(4, "little"), header, jpeg))
+                
+                # Hand the frame to every client; a slow client never holds up the rest
+                for queue in list(self._client_queues):
+                    try:
+                        queue.put_nowait(message)
+                    except asyncio.QueueFull:
+                        # Client is behind: drop its oldest frame
+                        queue.get_nowait()
+                        queue.put_nowait(message)
+                
+                # Control frame rate
+                await asyncio.sleep(frame_delay)
+                
+        finally:
+            cap.release()
+            await self.telemetry_collector.stop()
+            self.is_processing = False
+    
+    async def _send_frames(self, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Send queued frame messages to one client
+        
+        Each WebSocket message is one or more [4-byte little-endian length][frame
+        message] entries: when the client falls behind, the frames queued up
+        meanwhile share one message and its framing overhead.
         """
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < _MAX_FRAME_BATCH and not queue.empty():
+                    batch.append(queue.get_nowait())
+                send = asyncio.ensure_future(websocket.send_bytes(
+                    b"".join(part for m in batch for part in (len(m).to_bytes(4, "little"), m))
+                ))
+                # Shielded: a timeout must not cancel a send halfway through a frame
+                await asyncio.wait_for(asyncio.shield(send), timeout=_SEND_TIMEOUT)
+        except Exception:
+            # Disconnected or hung: close the socket, so a browser that is still
+            # connected sees it and reconnects rather than freezing on the last frame
+            self._client_queues.discard(queue)
+            with contextlib.suppress(Exception):
+                await websocket.close()
+    
+    def _snap_readings(self, telemetry: Optional[TelemetryFrame]) -> Tuple[Optional[float], ...]:
+        """(light, color_temp, motion) snapped to _READING_STEPS; None where a reading is missing"""
+        readings = []
+        for t_type, step in _READING_STEPS.items():
+            value = telemetry.get_value(t_type, None) if telemetry else None
+            readings.append(None if value is None else round(value / step) * step)
+        return tuple(readings)
     
+    def _render(self, frame: np.ndarray, frame_index: int,
+                telemetry: Optional[TelemetryFrame]) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Render a frame under the current telemetry, reusing an earlier render when possible
+        
+        The telemetry is applied, the cache key taken and the frame rendered
+        under one hold of _render_lock, so a render left over from a stopped
+        loop can't change the parameters between them.
+        """
+        with self._render_lock:
+            # The video loops, so the same frame under the same parameters renders
+            # the same. The key holds every parameter exactly, so a cached render
+            # is the frame a fresh one would be
+            start_time = time.perf_counter()
+            self.hdr_processor.apply_readings(*self._snap_readings(telemetry))
+            params = self.hdr_processor.params
+            key = (frame_index, dataclasses.astuple(params))
+            jpeg = self._render_cache.get(key)
+            if jpeg is None:
+                jpeg, metrics = self._render_frame(frame)
+                self._render_cache[key] = jpeg
+                if len(self._render_cache) > _RENDER_CACHE_SIZE:
+                    self._render_cache.popitem(last=False)
+                return jpeg, metrics
+            
+            self._render_cache.move_to_end(key)
+            # Report this frame's real cost and parameters, not the cached render's
+            return jpeg, {
+                "process_time_ms": (time.perf_counter() - start_time) * 1000,
+                "params": {
+                    "exposure": params.exposure,
+                    "contrast": params.contrast,
+                    "saturation": params.saturation
+                }
+            }
+    
+    def _render_frame(self, frame: np.ndarray) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Enhance a frame and JPEG-encode the labelled side-by-side view
+        
+        Uses the parameters already applied to the processor; the caller
+        holds _render_lock.
+        """
+        # Process frame
+        enhanced_frame, metrics = self.hdr_processor.process_frame(frame)
+        
+        # Labelled side-by-side view (buffer and label strip only on the first frame of a size)
+        h, w = frame.shape[:2]
+        composite = self._composite_buf
+        if composite is None or composite.shape != (h + 60, w*2, 3):
+            composite = np.empty((h + 60, w*2, 3), dtype=np.uint8)
+            composite[:60] = 0
+            cv2.putText(composite, "Original SDR", (20, 40),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            cv2.putText(composite, "GPL Enhanced", (w + 20, 40),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            self._composite_buf = composite
+        np.copyto(composite[60:, :w], frame)
+        np.copyto(composite[60:, w:], enhanced_frame)
+        
+        # Resize for web display; encode cost scales with the preview's pixel count
+        display_frame = cv2.resize(composite, (960, 315), dst=self._display_buf,
+                                   interpolation=cv2.INTER_AREA)
+        
+        # Encode as JPEG (libjpeg-turbo when installed); the bytes go out as-is, without base64
+        return encode_jpeg(display_frame, quality=70), metrics
+        
     async def run(self):
         """Run the web demo"""
         config = uvicorn.Config(
             self.app,
             host="0.0.0.0",
             port=8000,
-            log_level="info"
+            log_level="warning",
+            access_log=False,  # No per-request log record on the streaming path
+            loop=EVENT_LOOP,
+            http="httptools",
+            ws="websockets"
         )
         server = uvicorn.Server(config)
         await server.serve()
@@ -630,4 +806,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    # serve() runs on our loop, not one uvicorn creates, so pick uvloop here too
+    if EVENT_LOOP == "uvloop":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file